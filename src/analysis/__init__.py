@@ -0,0 +1,2 @@
+from .archive import analyse_archive
+from .bulk import analyse_positions
@@ -0,0 +1,30 @@
+import argparse, json, os, sys
+from .archive import analyse_archive
+
+# Re-score every position of a game archive with minimax, from src:
+#   python -m analysis resource/records/games.hgr --depth 3 --workers 4 --out analysis.jsonl
+# One JSON line per position (played and best move, value, agreement), a summary line last
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analysis", description="Re-analyse recorded Halma games")
+    parser.add_argument("archive", help="game archive written by the GUI or python -m arena --record")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--max-time", type=float, default=-1, help="seconds per position, -1 for depth only")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="-", help="JSONL output file, - for stdout")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    count = agree = 0
+    try:
+        for line in analyse_archive(args.archive, args.depth, args.max_time, args.workers):
+            count += 1
+            agree += line["agree"]
+            out.write(json.dumps(line) + "\n")
+        out.write(json.dumps({"summary": True, "positions": count, "agreement": agree / count if count else 0.0}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from collections import deque
+from controller.halma import Board
+from controller.record import read_records
+from protocol.notation import move_text
+from .bulk import analyse_positions
+
+def replay(path: str):
+    # (game, ply, id, played move, recorded eval, board) of every position of an archive, streamed,
+    # board is set to the position until the next one
+    board = None
+    for game, record in enumerate(read_records(path)):
+        if board is None or board.size != record.size:
+            board = Board(record.size, tt_size_mb=0, evaluator=None, book=None, race=False)
+        for ply, (id, move) in enumerate(record.replay(board)):
+            yield game, ply, id, move, record.evals[ply], board
+
+def analyse_archive(path: str, depth: int = 3, max_time: float = -1, workers: int = None, window: int = None):
+    # Re-score every position of an archive on a process pool, results come back in archive order.
+    # The positions go through the shared snapshot store (analysis/bulk.py), at most window chunks
+    # are in flight, so memory does not grow with the archive
+    games = deque()
+    def feed():
+        for game, ply, id, move, recorded, board in replay(path):
+            games.append((game, ply, id, move, recorded, board.size))
+            yield board, id
+    for value, best, reached in analyse_positions(feed(), depth, max_time, workers, window=window):
+        yield result(*games.popleft(), value, best, reached)
+
+def result(game: int, ply: int, id: int, move: int, recorded, size: int, value, best, depth: int):
+    return {
+        "game": game, "ply": ply, "side": id.name.lower(), "played": move_text(size, move),
+        "recorded_eval": recorded, "value": value, "best": None if best is None else move_text(size, best),
+        "depth": depth, "agree": best == move,
+    }
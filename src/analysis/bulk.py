@@ -0,0 +1,75 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from controller.halma import Board
+from controller.snapshot import SnapshotStore
+
+# Many positions to the analysis workers through a shared snapshot store (controller/snapshot.py):
+# the coordinator writes every position into a slot, a task is only a slot range. The store is a
+# ring of window chunks, a chunk's slots are written again once its results have been handed out
+
+# Store and boards of the worker process, one board per size so the worker TT survives between positions
+_store = None
+_boards = {}
+
+def init_worker(handle: dict):
+    global _store
+    _store = SnapshotStore(**handle)
+
+def worker_board(size: int, depth: int, max_time: float):
+    board = _boards.get(size)
+    if board is None:
+        board = _boards[size] = Board(size, book=None, race=False)
+    board.max_depth = depth
+    board.max_time = max_time
+    return board
+
+def search(board: Board, id: int):
+    res = board.minimax(id)
+    return res.value, None if res.step is None else board.step_key(res.step), res.stats.depth
+
+def rescore_slots(start: int, count: int, depth: int, max_time: float):
+    # Worker task: (value, best move, depth) of the positions of slots start..start+count
+    results = []
+    for i in range(start, start + count):
+        board = worker_board(_store.size_of(i), depth, max_time)
+        results.append(search(board, _store.load(i, board)))
+    return results
+
+def analyse_positions(positions, depth: int = 3, max_time: float = -1, workers: int = None, chunk: int = 16,
+                      window: int = None, path: str = None):
+    # (value, best move, depth) of every (board or Board.encode() state, side to move) position, in order.
+    # A board is only read while its snapshot is written, the same board can come back at every position.
+    # At most window chunks are in flight. The store is in shared memory, or in the file path
+    # (Python < 3.8), and is removed at the end
+    workers = workers or os.cpu_count()
+    window = window or workers * 4
+    store = SnapshotStore(window * chunk, path=path)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(store.handle,)) as executor:
+            yield from run(executor, store, positions, depth, max_time, chunk, window)
+    finally:
+        store.close()
+        store.unlink()
+
+def run(executor, store: SnapshotStore, positions, depth: int, max_time: float, chunk: int, window: int):
+    pending = deque()
+    filled = 0
+    block = 0
+    for position, id in positions:
+        if filled == 0 and len(pending) >= window:
+            # The oldest chunk's slots are written next
+            yield from pending.popleft().result()
+        if isinstance(position, (bytes, bytearray)):
+            store.write_state(block * chunk + filled, position, id)
+        else:
+            store.write(block * chunk + filled, position, id)
+        filled += 1
+        if filled == chunk:
+            pending.append(executor.submit(rescore_slots, block * chunk, chunk, depth, max_time))
+            block = (block + 1) % window
+            filled = 0
+    if filled:
+        pending.append(executor.submit(rescore_slots, block * chunk, filled, depth, max_time))
+    while pending:
+        yield from pending.popleft().result()
@@ -0,0 +1,2 @@
+from .engine import EngineConfig, play_game
+from .elo import elo_estimate
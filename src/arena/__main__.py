@@ -0,0 +1,100 @@
+import argparse, itertools, json, os, sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from controller.record import append_record
+from .engine import EngineConfig, play_game
+from .elo import elo_estimate
+
+# Headless tournament, from src:
+#   python -m arena --engine minimax:max_time=0.5 --engine local:max_time=0.5,sample_min=20 \
+#       --size 8 --size 10 --games 20 --workers 8 --out results.jsonl
+# Every pair of engines plays --games games per board size with alternating colors.
+# Each finished game is one JSON line, the summary lines come last.
+# --record games.hgr appends every game to a game archive (see controller/record.py).
+
+def schedule(engines, sizes, games):
+    seed = 0
+    for size in sizes:
+        for a, b in itertools.combinations(range(len(engines)), 2):
+            for game in range(games):
+                red, green = (a, b) if game % 2 == 0 else (b, a)
+                seed += 1
+                yield size, red, green, seed
+
+def unique_names(engines):
+    # The same spec given twice plays as two engines, games and summaries tell them apart by name
+    names = set()
+    for config in engines:
+        name, n = config.name, 1
+        while name in names:
+            n += 1
+            name = "%s#%d" % (config.name, n)
+        config.name = name
+        names.add(name)
+
+def summarize(engines, results):
+    lines = []
+    for a, b in itertools.combinations(range(len(engines)), 2):
+        na, nb = engines[a].name, engines[b].name
+        for size in sorted({r["size"] for r in results}):
+            games = [r for r in results if r["size"] == size and {r["red"], r["green"]} == {na, nb}]
+            wins = sum((r["red"] if r["winner"] == "red" else r["green"]) == na for r in games if r["winner"])
+            losses = sum(1 for r in games if r["winner"]) - wins
+            draws = len(games) - wins - losses
+            elo, low, high = elo_estimate(wins, draws, losses)
+            def avg(name, field):
+                values = [r["red_" + field] for r in games if r["red"] == name] + [r["green_" + field] for r in games if r["green"] == name]
+                return sum(values) / len(values) if values else 0.0
+            lines.append({
+                "summary": True, "size": size, "engine": na, "opponent": nb,
+                "games": len(games), "wins": wins, "draws": draws, "losses": losses,
+                "win_rate": wins / len(games) if games else 0.0,
+                "elo": elo, "elo_low": low, "elo_high": high,
+                "move_time": avg(na, "move_time"), "opponent_move_time": avg(nb, "move_time"),
+                "nps": avg(na, "nps"), "opponent_nps": avg(nb, "nps"),
+            })
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m arena", description="Headless Halma engine tournament")
+    parser.add_argument("--engine", action="append", required=True,
+                        help="engine spec, e.g. local:max_time=1,anneal_threshold=0.8 (at least two)")
+    parser.add_argument("--size", action="append", type=int, choices=(8, 10, 16))
+    parser.add_argument("--games", type=int, default=10, help="games per engine pair and size")
+    parser.add_argument("--max-moves", type=int, default=400)
+    parser.add_argument("--repetitions", type=int, default=3, help="n-fold repetition draw, 0 to play on")
+    parser.add_argument("--game-time", type=float, default=None, help="seconds on each side's clock, losing on time")
+    parser.add_argument("--increment", type=float, default=0, help="seconds added to the clock after every move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="-", help="JSONL output file, - for stdout")
+    parser.add_argument("--record", help="game archive to append the games to")
+    args = parser.parse_args(argv)
+    if len(args.engine) < 2:
+        parser.error("need at least two --engine")
+
+    engines = [EngineConfig.parse(spec) for spec in args.engine]
+    unique_names(engines)
+    sizes = args.size or [8]
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(play_game, size, engines[red], engines[green], args.max_moves, seed,
+                                args.record is not None, args.repetitions, args.game_time, args.increment)
+                for size, red, green, seed in schedule(engines, sizes, args.games)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if args.record is not None:
+                    append_record(args.record, result.pop("record"))
+                results.append(result)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+        for line in summarize(engines, results):
+            out.write(json.dumps(line) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
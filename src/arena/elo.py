@@ -0,0 +1,18 @@
+import math
+
+def elo_diff(score: float):
+    # Elo difference for an expected score in (0, 1)
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return 400 * math.log10(score / (1 - score))
+
+def elo_estimate(wins: int, draws: int, losses: int, z: float = 1.96):
+    # Elo difference with a z-sigma Wilson score interval of the score (a draw counts half a win),
+    # which stays wide when every game has the same result
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, -math.inf, math.inf
+    score = (wins + 0.5 * draws) / games
+    z2 = z * z / games
+    center = (score + z2 / 2) / (1 + z2)
+    margin = z * math.sqrt(score * (1 - score) / games + z2 / (4 * games)) / (1 + z2)
+    return elo_diff(score), elo_diff(center - margin), elo_diff(center + margin)
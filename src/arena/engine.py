@@ -0,0 +1,164 @@
+import random, time
+from model.player import Player
+from controller.halma import Board
+from controller.bitboard import BACKENDS, make_board
+from controller.record import GameRecord
+from controller.settings import local_settings
+
+ENGINES = ("minimax", "local", "mcts")
+
+class EngineConfig:
+    # One engine setup, built from a spec like "local:max_time=1,sample_min=20"
+    def __init__(self, engine: str = "minimax", max_time: float = 1, depth: int = 1,
+                 anneal_threshold: float = None, sample_min: int = None, sample_div: float = None,
+                 prune: bool = True, ordering: bool = True, evaluator: str = "default", book: bool = True,
+                 race: bool = True, selection: str = "puct", exploration: float = 1.4, rollout: str = "greedy",
+                 rollout_depth: int = 8, iterations: int = 2000, backend: str = "array", name: str = None):
+        assert engine in ENGINES
+        assert backend in BACKENDS
+        self.engine = engine
+        self.max_time = max_time
+        self.depth = depth
+        # Local search settings, None for the tuned ones (resource/config/search.json)
+        settings = local_settings()
+        self.anneal_threshold = settings["anneal_threshold"] if anneal_threshold is None else anneal_threshold
+        self.sample_min = settings["sample_min"] if sample_min is None else sample_min
+        self.sample_div = settings["sample_div"] if sample_div is None else sample_div
+        self.prune = prune
+        self.ordering = ordering
+        # "default", "cost" or a weights file
+        self.evaluator = evaluator
+        self.book = book
+        self.race = race
+        self.selection = selection
+        self.exploration = exploration
+        self.rollout = rollout
+        self.rollout_depth = rollout_depth
+        self.iterations = iterations
+        # Board backend, "array" or "bitboard"
+        self.backend = backend
+        self.name = name or engine
+
+    @staticmethod
+    def convert(key: str, value: str):
+        # Option value from its text
+        if key in ("prune", "ordering", "book", "race"):
+            return value.lower() in ("1", "true", "yes")
+        if key in ("depth", "sample_min", "rollout_depth", "iterations"):
+            return int(value)
+        if key in ("engine", "evaluator", "selection", "rollout", "backend", "name"):
+            return value
+        return float(value)
+
+    @classmethod
+    def parse(cls, spec: str):
+        engine, _, options = spec.partition(":")
+        kwargs = {}
+        for option in filter(None, options.split(",")):
+            key, value = option.split("=")
+            kwargs[key] = cls.convert(key, value)
+        kwargs.setdefault("name", spec)
+        return cls(engine, **kwargs)
+
+    def set(self, key: str, value: str):
+        if key not in self.__dict__:
+            raise KeyError(key)
+        value = self.convert(key, value)
+        if key == "engine":
+            assert value in ENGINES
+        if key == "backend":
+            assert value in BACKENDS
+        setattr(self, key, value)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def new_board(self, size: int):
+        return make_board(size, self.backend, max_depth=self.depth, max_time=self.max_time, prune=self.prune,
+                          ordering=self.ordering, evaluator=self.evaluator, book="default" if self.book else None,
+                          race=self.race)
+
+    def search(self, board: Board, id: int, stop=None):
+        if self.engine == "local":
+            return board.minimax_with_local(id, self.anneal_threshold, self.sample_min, self.sample_div, stop)
+        if self.engine == "mcts":
+            return board.mcts(id, self.selection, self.exploration, self.rollout, self.rollout_depth, self.iterations, stop)
+        return board.minimax(id, stop)
+
+def play_game(size: int, red: EngineConfig, green: EngineConfig, max_moves: int = 400, seed: int = None,
+              record: bool = False, repetition_limit: int = 3, game_time: float = None, increment: float = 0):
+    # Play one headless game, every engine keeps its own board (and transposition table)
+    # record: add the GameRecord of the game to the result as "record"
+    # repetition_limit: the game is a draw when a position comes back that many times (0 never)
+    # game_time: seconds on each side's clock, increment added after every move. The engines share
+    # their time out of it (still capped by max_time, -1 for the clock only), a side whose clock
+    # runs out loses on time
+    random.seed(seed)
+    game = GameRecord(size, {"red": red.to_dict(), "green": green.to_dict(), "seed": seed})
+    configs = {Player.RED: red, Player.GREEN: green}
+    boards = {Player.RED: red.new_board(size), Player.GREEN: green.new_board(size)}
+    # Positions of the game, the searches score repeated ones as draws
+    history = {boards[Player.RED].tt_key(Player.RED, True): 1}
+    for board in boards.values():
+        board.repetitions = history
+    stats = {id: {"moves": 0, "time": 0.0, "nodes": 0} for id in configs}
+    clocks = {id: game_time for id in configs}
+    id = Player.RED
+    winner = None
+    reason = "move_cap"
+    moves = 0
+    while moves < max_moves:
+        board = boards[id]
+        if game_time is not None:
+            board.time_manager.set_clock(id, clocks[id], increment)
+        st = time.time()
+        res = configs[id].search(board, id)
+        elapsed = time.time() - st
+        stats[id]["time"] += elapsed
+        stats[id]["nodes"] += res.stats.nodes
+        stats[id]["moves"] += 1
+        if game_time is not None:
+            clocks[id] += increment - elapsed
+            if clocks[id] < 0:
+                winner, reason = Player.GREEN if id == Player.RED else Player.RED, "time"
+                break
+        if res[1] is None:
+            reason = "no_move"
+            break
+        move = board.step_key(res[1])
+        game.add(move, res.value, elapsed)
+        for other in boards.values():
+            other.apply_move(move)
+        moves += 1
+        if board.count_finish_red == board.count_pion:
+            winner, reason = Player.RED, "finished"
+            break
+        if board.count_finish_green == board.count_pion:
+            winner, reason = Player.GREEN, "finished"
+            break
+        id = Player.GREEN if id == Player.RED else Player.RED
+        key = board.tt_key(id, True)
+        history[key] = history.get(key, 0) + 1
+        if repetition_limit and history[key] >= repetition_limit:
+            reason = "repetition"
+            break
+
+    result = {
+        "size": size,
+        "red": red.name,
+        "green": green.name,
+        "winner": None if winner is None else winner.name.lower(),
+        "reason": reason,
+        "moves": moves,
+        "seed": seed,
+    }
+    for id, side in ((Player.RED, "red"), (Player.GREEN, "green")):
+        s = stats[id]
+        result[side + "_move_time"] = s["time"] / max(s["moves"], 1)
+        result[side + "_nps"] = s["nodes"] / s["time"] if s["time"] > 0 else 0.0
+        if game_time is not None:
+            result[side + "_clock"] = clocks[id]
+    if record:
+        game.winner = winner
+        result["record"] = game
+    return result
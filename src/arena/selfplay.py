@@ -0,0 +1,51 @@
+import argparse, json, sys, time
+from controller.record import append_record
+from controller.selfplay import LockstepGames, POLICIES
+
+# Many cheap games at once for data generation (controller/selfplay.py), from src:
+#   python -m arena.selfplay --size 8 --games 10000 --policy greedy --record resource/records/selfplay.hgr
+# One JSON line per game, the summary line last. --check cross-checks the move generation of
+# that many games with Board.gen_all_pos_steps every ply (slow, for testing)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m arena.selfplay", description="Lockstep Halma self-play")
+    parser.add_argument("--size", type=int, default=8, choices=(8, 10, 16))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", default="greedy", choices=POLICIES)
+    parser.add_argument("--max-moves", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", type=int, default=0, help="games cross-checked every ply")
+    parser.add_argument("--out", default="-", help="JSONL output file, - for stdout")
+    parser.add_argument("--record", help="game archive to append the games to")
+    args = parser.parse_args(argv)
+
+    games = LockstepGames(args.size, args.games, args.policy, args.max_moves, args.seed)
+    mismatches = set()
+    st = time.time()
+    while True:
+        if args.check:
+            mismatches.update(games.cross_check(args.check))
+        if not games.step():
+            break
+    elapsed = time.time() - st
+    results = games.results()
+    if args.record is not None:
+        for record in games.records():
+            append_record(args.record, record)
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+        out.write(json.dumps({
+            "summary": True, "size": args.size, "policy": args.policy, "games": args.games,
+            "red": sum(r["winner"] == "red" for r in results), "green": sum(r["winner"] == "green" for r in results),
+            "draws": sum(r["winner"] is None for r in results),
+            "moves": sum(r["moves"] for r in results) / len(results),
+            "games_per_s": args.games / elapsed, "mismatches": sorted(mismatches),
+        }) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import random
+from model.player import Player
+from controller.halma import Board
+
+def gen_positions(size: int, count: int, plies: int = 20, seed: int = 0):
+    # Fixed corpus: encodings reached by seeded random playouts of the given length
+    rng = random.Random(seed * 1000 + size)
+    positions = []
+    while len(positions) < count:
+        board = Board(size, tt_size_mb=0)
+        id = Player.RED
+        for _ in range(plies):
+            moves = board.gen_moves(id)
+            if not moves:
+                break
+            # Sorted so the corpus does not depend on move generation order
+            board.apply_move(rng.choice(sorted(moves)))
+            id = Player.GREEN if id == Player.RED else Player.RED
+        else:
+            positions.append((board.encode(), id))
+    return positions
@@ -0,0 +1,60 @@
+import argparse, json, sys, time, tracemalloc
+from array import array
+from controller.halma import Board
+from .corpus import gen_positions
+
+# Memory use of the search on a fixed corpus, from src:
+#   python -m benchmark.memory --size 16 --depth 3
+# peak:            tracemalloc peak over the searches (tables built before tracing are not counted)
+# blocks_per_node: memory blocks the searches leave allocated (tables, caches, kept move lists), per node
+# peak_per_node:   peak bytes per node
+# move_bytes:      bytes of the move list of one node (container and move objects, cells are shared)
+# cell_bytes:      bytes of one Cell (with its __dict__ if it has one)
+
+def move_list_bytes(moves):
+    size = sys.getsizeof(moves)
+    if not isinstance(moves, array):
+        size += sum(sys.getsizeof(move) for move in moves)
+    return size
+
+def cell_bytes(cell):
+    size = sys.getsizeof(cell)
+    if hasattr(cell, "__dict__"):
+        size += sys.getsizeof(cell.__dict__)
+    return size
+
+def run(size: int, depth: int, positions: int):
+    corpus = gen_positions(size, positions)
+    boards = [(Board.decode(state, max_depth=depth, book=None, race=False), id) for state, id in corpus]
+    # Move lists as the search builds them
+    move_bytes = [move_list_bytes(board.gen_moves(id)) for board, id in boards]
+    nodes = 0
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    st = time.perf_counter()
+    for board, id in boards:
+        nodes += board.minimax(id).stats.nodes
+    seconds = time.perf_counter() - st
+    _, peak = tracemalloc.get_traced_memory()
+    # The boards are still alive, what their searches allocated is still traced
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "size": size, "depth": depth, "nodes": nodes, "seconds": round(seconds, 4),
+        "peak_kb": round(peak / 1024, 1),
+        "blocks_per_node": round(blocks / max(nodes, 1), 3), "peak_per_node": round(peak / max(nodes, 1), 1),
+        "move_bytes": round(sum(move_bytes) / len(move_bytes)),
+        "cell_bytes": cell_bytes(boards[0][0].flat[0]),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.memory", description="Halma search memory use")
+    parser.add_argument("--size", type=int, default=16, choices=(8, 10, 16))
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--positions", type=int, default=4)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.size, args.depth, args.positions)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse, json, os, time
+from controller.halma import Board
+from controller.parallel import ParallelSearch
+from .corpus import gen_positions
+
+# Speedup of the root-splitting search from 1 to N workers at a fixed depth
+# Usage (from src): python -m benchmark.parallel --size 10 --depth 3 --max-workers 8
+
+def run(size: int, depth: int, positions: int, workers: int):
+    search = ParallelSearch(workers)
+    try:
+        total_time = 0
+        total_nodes = 0
+        for state, id in gen_positions(size, positions):
+            board = Board.decode(state, max_depth=depth, book=None, race=False)
+            st = time.time()
+            total_nodes += search.minimax(board, id).stats.nodes
+            total_time += time.time() - st
+    finally:
+        search.shutdown()
+    return total_time, total_nodes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel search scaling benchmark")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--positions", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    base = None
+    workers = 1
+    while workers <= args.max_workers:
+        seconds, nodes = run(args.size, args.depth, args.positions, workers)
+        base = base or seconds
+        print(json.dumps({
+            "size": args.size, "depth": args.depth, "workers": workers,
+            "seconds": round(seconds, 3), "nodes": nodes,
+            "nps": round(nodes / seconds), "speedup": round(base / seconds, 2),
+        }))
+        workers = workers * 2 if workers * 2 <= args.max_workers or workers == args.max_workers else args.max_workers
+
+if __name__ == "__main__":
+    main()
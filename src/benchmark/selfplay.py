@@ -0,0 +1,62 @@
+import argparse, json, random, time
+from model.player import Player
+from controller.halma import Board
+from controller.mcts import ROLLOUT_POLICIES
+from controller.selfplay import LockstepGames
+
+# Games per second of the lockstep simulator against one Board game at a time with the same
+# policy, from src:
+#   python -m benchmark.selfplay --size 8 --games 1000 --policy greedy --check 8
+# --check cross-checks the move generation of that many games with Board.gen_all_pos_steps every ply
+
+def sequential(size: int, games: int, policy: str, max_moves: int, seed: int):
+    random.seed(seed)
+    choose = ROLLOUT_POLICIES[policy]
+    for _ in range(games):
+        board = Board(size, tt_size_mb=0, book=None, race=False)
+        id = Player.RED
+        for _ in range(max_moves):
+            moves = board.gen_moves(id)
+            if not moves:
+                break
+            board.apply_move(choose(board, moves, id))
+            if board.count_finish_red == board.count_pion or board.count_finish_green == board.count_pion:
+                break
+            id = Player.GREEN if id == Player.RED else Player.RED
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.selfplay", description="Lockstep self-play throughput")
+    parser.add_argument("--size", type=int, default=8, choices=(8, 10, 16))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--sequential-games", type=int, default=20, help="games of the one-at-a-time baseline")
+    parser.add_argument("--policy", default="greedy", choices=("random", "greedy", "eval"))
+    parser.add_argument("--max-moves", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=0, help="games cross-checked every ply")
+    args = parser.parse_args(argv)
+
+    games = LockstepGames(args.size, args.games, args.policy, args.max_moves, args.seed)
+    mismatches = set()
+    st = time.perf_counter()
+    while True:
+        if args.check:
+            mismatches.update(games.cross_check(args.check))
+        if not games.step():
+            break
+    lockstep = time.perf_counter() - st
+    st = time.perf_counter()
+    sequential(args.size, args.sequential_games, args.policy, args.max_moves, args.seed)
+    baseline = time.perf_counter() - st
+    results = games.results()
+    print(json.dumps({
+        "size": args.size, "policy": args.policy, "games": args.games,
+        "red": sum(r["winner"] == "red" for r in results), "green": sum(r["winner"] == "green" for r in results),
+        "moves": sum(r["moves"] for r in results) / len(results),
+        "lockstep_games_per_s": args.games / lockstep,
+        "sequential_games_per_s": args.sequential_games / baseline,
+        "speedup": args.games / lockstep / (args.sequential_games / baseline),
+        "mismatches": sorted(mismatches),
+    }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse, json, os, statistics, subprocess, sys, time
+
+# Cold start of engine processes, as match runners spawn them, from src:
+#   python -m benchmark.startup --runs 20 --engine minimax:max_time=0.1 --gui
+# Per run: time from spawn to readyok (uci, isready) and to the first bestmove of the start position.
+# The modules imported by python -m protocol are listed from -X importtime, heavy ones are reported
+# (the headless engine should import none). --gui also times spawning the GUI up to its main window
+# (offscreen)
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "PyQt5", "asyncio", "multiprocessing", "concurrent")
+
+GUI_SCRIPT = """
+import sys
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from view import MainWindow
+window = MainWindow()
+window.show()
+app.processEvents()
+print("ready", flush=True)
+"""
+
+def read_until(proc, prefix: str):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("engine exited before " + prefix)
+        if line.startswith(prefix):
+            return line
+
+def engine_run(engine: str, size: int):
+    # (seconds to readyok, seconds to the first bestmove)
+    st = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "protocol", "--engine", engine], cwd=SRC_DIR,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        proc.stdin.write("uci\nisready\n")
+        proc.stdin.flush()
+        read_until(proc, "readyok")
+        ready = time.perf_counter() - st
+        proc.stdin.write("position startpos %d\ngo\n" % size)
+        proc.stdin.flush()
+        read_until(proc, "bestmove")
+        first = time.perf_counter() - st
+        proc.stdin.write("quit\n")
+        proc.stdin.flush()
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    return ready, first
+
+def engine_imports(engine: str):
+    # (modules imported by python -m protocol, total import microseconds)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "protocol", "--engine", engine], cwd=SRC_DIR,
+                          input="quit\n", stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    modules = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us, cumulative, name = line[len("import time:"):].split("|")
+            if self_us.strip().isdigit():
+                modules.append(name.strip())
+                total += int(self_us)
+    return modules, total
+
+def gui_run():
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    st = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", GUI_SCRIPT], cwd=SRC_DIR, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    try:
+        read_until(proc, "ready")
+        return time.perf_counter() - st
+    finally:
+        proc.kill()
+        proc.wait()
+
+def summary(values):
+    return {"median_ms": round(statistics.median(values) * 1000, 1), "min_ms": round(min(values) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.startup", description="Engine process cold start")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--engine", default="minimax:max_time=0.1,depth=1", help="engine spec of python -m protocol")
+    parser.add_argument("--size", type=int, default=8, choices=(8, 10, 16))
+    parser.add_argument("--gui", action="store_true", help="time the GUI start too")
+    args = parser.parse_args(argv)
+
+    # Python itself, the floor of every spawn
+    interpreter = []
+    for _ in range(args.runs):
+        st = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        interpreter.append(time.perf_counter() - st)
+    runs = [engine_run(args.engine, args.size) for _ in range(args.runs)]
+    modules, total = engine_imports(args.engine)
+    result = {
+        "engine": args.engine, "size": args.size, "runs": args.runs,
+        "python": summary(interpreter),
+        "readyok": summary([ready for ready, first in runs]),
+        "first_bestmove": summary([first for ready, first in runs]),
+        "imports": len(modules), "import_ms": round(total / 1000, 1),
+        "heavy_imports": sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY}),
+    }
+    if args.gui:
+        result["gui"] = summary([gui_run() for _ in range(args.runs)])
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse, json, os, random, sys, time
+from model.player import Player
+from controller.halma import Board
+from controller.bitboard import make_board
+from .corpus import gen_positions
+
+# Engine benchmark over a fixed corpus, from src:
+#   python -m benchmark.suite                    # run and compare with baseline.json
+#   python -m benchmark.suite --update-baseline  # store this machine's numbers
+# Prints one JSON object per measurement, exit code 1 on a regression:
+# a perft node count that differs from the baseline (move generation changed)
+# or nodes per second below baseline * (1 - tolerance)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Per size: corpus length, perft depth (list and bitboard backends), fixed search depth, local search depth
+CONFIG = {
+    8: {"positions": 4, "perft": 3, "perft_bitboard": 3, "search": 4, "local": 3},
+    10: {"positions": 4, "perft": 2, "perft_bitboard": 2, "search": 3, "local": 2},
+    16: {"positions": 2, "perft": 2, "perft_bitboard": 2, "search": 3, "local": 2},
+}
+
+def other(id: int):
+    return Player.GREEN if id == Player.RED else Player.RED
+
+def perft(board: Board, id: int, depth: int):
+    # Leaf count of the full move tree, gen_moves + apply_move/undo_move only
+    if depth == 0:
+        return 1
+    moves = board.gen_moves(id)
+    if not moves:
+        return 1
+    total = 0
+    for move in moves:
+        board.apply_move(move)
+        total += perft(board, other(id), depth - 1)
+        board.undo_move(move)
+    return total
+
+def bench_perft(size: int, positions, depth: int, backend: str = "array"):
+    nodes = 0
+    st = time.perf_counter()
+    for state, id in positions:
+        board = make_board(size, backend, tt_size_mb=0)
+        board.set_state(state[1:])
+        nodes += perft(board, id, depth)
+    return nodes, time.perf_counter() - st
+
+def bench_perft_bitboard(size: int, positions, depth: int):
+    return bench_perft(size, positions, depth, "bitboard")
+
+def bench_search(size: int, positions, depth: int):
+    nodes = 0
+    seconds = 0
+    for state, id in positions:
+        board = Board.decode(state, max_depth=depth, book=None, race=False)
+        st = time.perf_counter()
+        nodes += board.minimax(id).stats.nodes
+        seconds += time.perf_counter() - st
+    return nodes, seconds
+
+def bench_local(size: int, positions, depth: int):
+    nodes = 0
+    seconds = 0
+    for state, id in positions:
+        board = Board.decode(state, max_depth=depth, tt_size_mb=0, book=None, race=False)
+        st = time.perf_counter()
+        nodes += board.minimax_with_local(id).stats.nodes
+        seconds += time.perf_counter() - st
+    return nodes, seconds
+
+BENCHES = {"perft": bench_perft, "perft_bitboard": bench_perft_bitboard, "search": bench_search, "local": bench_local}
+
+def run(sizes, repeat: int = 3):
+    # Best of repeat runs, timings on a shared machine are noisy
+    results = []
+    for size in sizes:
+        config = CONFIG[size]
+        positions = gen_positions(size, config["positions"])
+        for name, bench in BENCHES.items():
+            seconds = None
+            for _ in range(repeat):
+                # Seeded, the local search samples steps at random
+                random.seed(size)
+                nodes, t = bench(size, positions, config[name])
+                seconds = t if seconds is None else min(seconds, t)
+            results.append({
+                "bench": name, "size": size, "depth": config[name],
+                "nodes": nodes, "seconds": round(seconds, 4), "nps": round(nodes / seconds),
+            })
+    return results
+
+def compare(results, baseline, tolerance: float):
+    regressions = []
+    for result in results:
+        key = "%s/%d" % (result["bench"], result["size"])
+        base = baseline.get(key)
+        if base is None:
+            continue
+        result["baseline_nps"] = base["nps"]
+        if result["bench"] == "perft" and base.get("depth") == result["depth"] and base["nodes"] != result["nodes"]:
+            regressions.append(key + ": perft nodes %d != %d" % (result["nodes"], base["nodes"]))
+        if result["nps"] < base["nps"] * (1 - tolerance):
+            regressions.append(key + ": nps %d < %d" % (result["nps"], base["nps"]))
+    # Both backends generate the same moves, the bitboard one must keep up with the list one
+    runs = {(result["bench"], result["size"]): result for result in results}
+    for (bench, size), result in runs.items():
+        ref = runs.get(("perft", size))
+        if bench != "perft_bitboard" or ref is None:
+            continue
+        if result["nodes"] != ref["nodes"]:
+            regressions.append("perft_bitboard/%d: nodes %d != perft %d" % (size, result["nodes"], ref["nodes"]))
+        if result["nps"] < ref["nps"] * (1 - tolerance):
+            regressions.append("perft_bitboard/%d: nps %d < perft %d" % (size, result["nps"], ref["nps"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.suite", description="Halma engine benchmark")
+    parser.add_argument("--size", action="append", type=int, choices=sorted(CONFIG))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed nodes per second drop")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.size or sorted(CONFIG), args.repeat)
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        for result in results:
+            baseline["%s/%d" % (result["bench"], result["size"])] = result
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        regressions = []
+    else:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+    for result in results:
+        print(json.dumps(result))
+    print(json.dumps({"regressions": regressions}))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import argparse, os, sys
+from controller.book import book_path, write_book, OpeningBook
+from .builder import build
+
+# Offline opening book builder, from src:
+#   python -m book --size 8 --size 10 --size 16 --plies 8 --width 3 --depth 3
+# Writes resource/book/book<size>.bin, picked up by Board(book="default")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m book", description="Build Halma opening books")
+    parser.add_argument("--size", action="append", type=int, choices=(8, 10, 16))
+    parser.add_argument("--plies", type=int, default=8, help="book depth in plies from the start position")
+    parser.add_argument("--width", type=int, default=3, help="steps followed per position (best step first)")
+    parser.add_argument("--depth", type=int, default=3, help="search depth of every book position")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", help="output file (single size only), default resource/book/book<size>.bin")
+    args = parser.parse_args(argv)
+    sizes = args.size or [8, 10, 16]
+    if args.out and len(sizes) > 1:
+        parser.error("--out needs a single --size")
+
+    for size in sizes:
+        log = lambda msg: print("size %d %s" % (size, msg), file=sys.stderr)
+        entries = build(size, args.plies, args.width, args.depth, args.workers, log)
+        path = args.out or book_path(size)
+        write_book(path, entries)
+        book = OpeningBook(path)
+        print("%s: %d positions, %d bytes" % (path, len(book), os.path.getsize(path)))
+        book.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+from model.player import Player
+from controller.halma import Board
+
+def analyse(state: bytes, id: int, depth: int, width: int):
+    # Book entry of one position: (position key, move key, [(child state, next id)])
+    # Children are the searched best step and the width-1 steps with the best static score
+    board = Board.decode(state, max_depth=depth, book=None)
+    key = board.tt_key(id, True)
+    res = board.minimax(id)
+    if res.step is None:
+        return key, None, []
+    moves = sorted(board.gen_moves(id))
+    values = board.leaf_values(moves, id) if board.evaluator is not None else [0] * len(moves)
+    best = board.step_key(res.step)
+    ranked = [move for _, move in sorted(zip(values, moves), key=lambda vm: -vm[0]) if move != best]
+    children = []
+    for move in [best] + ranked[:width-1]:
+        board.apply_move(move)
+        children.append((board.encode(), Player.GREEN if id == Player.RED else Player.RED))
+        board.undo_move(move)
+    return key, best, children
+
+def build(size: int, plies: int = 6, width: int = 3, depth: int = 3, workers: int = None, log=None):
+    # Breadth-first over the positions reachable from the start in plies plies,
+    # returns {position key: move key}
+    entries = {}
+    frontier = [(Board(size, tt_size_mb=0, book=None).encode(), Player.RED)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for ply in range(plies):
+            results = executor.map(analyse, *zip(*[(state, id, depth, width) for state, id in frontier]))
+            seen = set()
+            next_frontier = []
+            for key, move, children in results:
+                if move is None or key in entries:
+                    continue
+                entries[key] = move
+                for child in children:
+                    if child not in seen:
+                        seen.add(child)
+                        next_frontier.append(child)
+            if log is not None:
+                log("ply %d: %d positions, %d entries" % (ply, len(frontier), len(entries)))
+            frontier = next_frontier
+    return entries
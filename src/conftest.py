@@ -0,0 +1 @@
+# Puts src on sys.path so the tests import the packages as the entry points do (python -m pytest from src or the repo root)
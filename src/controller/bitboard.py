@@ -0,0 +1,59 @@
+from array import array
+from .halma import Board
+
+def iter_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class BitBoard(Board):
+    # Board backend generating steps from integer bitmasks: the occupancy mask Board keeps up to
+    # date (occ) and the house masks. Cell objects are still kept in sync so the GUI and the step
+    # API are unchanged. The per-pion move cache keys the steps on the same occupancy deps as
+    # Board (the cells around the pion and around every jump landing)
+    def jump_targets(self, idx: int, id: int):
+        # (single step targets, jump chain landings) of the pion on idx
+        geo = self.geo
+        occ = self.occ
+        allowed = geo.full & ~occ & geo.allowed_mask(self.flat[idx].owner, id)
+        # Jump chain, expand the whole frontier at once: over an occupied neighbor onto an allowed cell
+        reached = 0
+        frontier = 1 << idx
+        while frontier:
+            landing = 0
+            for offset, guard in geo.jump_shifts:
+                if offset > 0:
+                    landing |= ((frontier & guard) << offset & occ) << offset
+                else:
+                    landing |= ((frontier & guard) >> -offset & occ) >> -offset
+            frontier = landing & allowed & ~reached
+            reached |= frontier
+        return geo.step_mask[idx] & allowed, reached
+
+    def targets(self, idx: int, id: int):
+        steps, reached = self.jump_targets(idx, id)
+        return steps | reached
+
+    def piece_steps(self, origin: int, id: int):
+        # Moves of one pion and the bitmask of cells whose occupancy they depend on (see Board.piece_steps)
+        steps, reached = self.jump_targets(origin, id)
+        zone = self.geo.zone
+        deps = 1 << origin | zone[origin]
+        for to in iter_bits(reached):
+            deps |= zone[to]
+        base = origin << 16
+        return array("I", [base | to for to in iter_bits(steps | reached)]), deps
+
+    def dfs_path(self, row: int, col: int, id: int):
+        idx = row*self.size + col
+        original = self.flat[idx]
+        return [(original, self.flat[to]) for to in iter_bits(self.targets(idx, id))]
+
+BACKENDS = {
+    "array": Board,
+    "bitboard": BitBoard,
+}
+
+def make_board(size, backend="array", **kwargs):
+    return BACKENDS[backend](size, **kwargs)
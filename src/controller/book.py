@@ -0,0 +1,61 @@
+import mmap, os, struct
+from functools import lru_cache
+
+# Book file: magic, record count, then records sorted by position key
+#   key:  64-bit position hash with the side to move (Board.tt_key)
+#   move: packed step (Board.step_key)
+MAGIC = b"HBK1"
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<QI")
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "book")
+
+def book_path(size: int):
+    return os.path.join(BOOK_DIR, "book%d.bin" % size)
+
+def write_book(path: str, entries: dict):
+    # entries: {position key: move key}
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries)))
+        for key in sorted(entries):
+            f.write(RECORD.pack(key, entries[key]))
+
+class OpeningBook:
+    # Read-only view of a book file, lookups are a binary search over the mapped records
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or HEADER.size + self.count * RECORD.size > len(self.data):
+            self.data.close()
+            raise ValueError("not an opening book: %s" % path)
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, key: int):
+        # Move key stored for the position key, None if not in the book
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, move = RECORD.unpack_from(self.data, HEADER.size + mid * RECORD.size)
+            if k == key:
+                return move
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def entries(self):
+        for i in range(self.count):
+            yield RECORD.unpack_from(self.data, HEADER.size + i * RECORD.size)
+
+    def close(self):
+        self.data.close()
+
+@lru_cache(maxsize=None)
+def get_book(size: int):
+    # Shipped book of a board size, None when there is none
+    path = book_path(size)
+    return OpeningBook(path) if os.path.exists(path) else None
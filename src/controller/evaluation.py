@@ -0,0 +1,149 @@
+import json, os
+from functools import lru_cache
+from model.cell import CellType, Pion
+from .geometry import get_geometry
+
+# Per side features, all kept up to date on every move
+#   distance:  summed Manhattan distance of the pions to the goal corner
+#   spread:    summed squared distance, grows with stragglers
+#   home:      pions already in the goal house
+#   free_goal: goal house cells with no pion on them
+#   blocked:   pions that never left their own house (they block the opponent's goal)
+FEATURES = ("distance", "spread", "home", "free_goal", "blocked")
+DISTANCE, SPREAD, HOME, FREE_GOAL, BLOCKED = range(len(FEATURES))
+
+# Sign of every feature in the side score, a larger side score is better for that side
+SIGNS = (-1, -1, 1, -1, -1)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "config", "evaluation.json")
+
+class EvalTables:
+    # Per cell feature values for a board size, indexed by [pion][cell index]
+    def __init__(self, size: int):
+        n = size
+        owner = get_geometry(size).owner
+        cells = [(i, j) for i in range(n) for j in range(n)]
+        self.distance = {
+            Pion.RED: [2*(n-1) - i - j for i, j in cells],
+            Pion.GREEN: [i + j for i, j in cells],
+        }
+        self.spread = {pion: [d*d for d in dist] for pion, dist in self.distance.items()}
+        # Goal and start house indicators
+        self.goal = {
+            Pion.RED: [int(o == CellType.GREEN_HOUSE) for o in owner],
+            Pion.GREEN: [int(o == CellType.RED_HOUSE) for o in owner],
+        }
+        self.start = {Pion.RED: self.goal[Pion.GREEN], Pion.GREEN: self.goal[Pion.RED]}
+
+@lru_cache(maxsize=None)
+def get_tables(size: int):
+    return EvalTables(size)
+
+def other(pion: int):
+    return Pion.GREEN if pion == Pion.RED else Pion.RED
+
+class Evaluator:
+    # Weighted feature evaluation. The score is linear in the features, so it is the sum of
+    # one precomputed value per pion (values(size)) and a move only changes it by
+    # values[pion][to] - values[pion][from]. Scores are from green's point of view like Board.cost
+    def __init__(self, weights: dict = None):
+        weights = weights or {}
+        self.weights = [float(weights.get(name, 0)) for name in FEATURES]
+        # Side score coefficients
+        self.coef = [w * s for w, s in zip(self.weights, SIGNS)]
+        self._values = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH):
+        with open(path) as f:
+            return cls(json.load(f)["weights"])
+
+    def save(self, path: str = DEFAULT_PATH):
+        with open(path, "w") as f:
+            json.dump({"weights": dict(zip(FEATURES, self.weights))}, f, indent=2)
+
+    def values(self, size: int):
+        # values[pion][idx]: score contribution of a pion on idx
+        if size not in self._values:
+            t = get_tables(size)
+            c = self.coef
+            values = {Pion.NONE: [0.0] * (size*size)}
+            for pion, sign in ((Pion.RED, -1), (Pion.GREEN, 1)):
+                values[pion] = [
+                    sign * (c[DISTANCE]*t.distance[pion][idx] + c[SPREAD]*t.spread[pion][idx] +
+                            c[HOME]*t.goal[pion][idx] + c[BLOCKED]*t.start[pion][idx]) +
+                    # Any pion takes a free goal cell of the side whose goal it is on
+                    c[FREE_GOAL] * (t.goal[Pion.RED][idx] - t.goal[Pion.GREEN][idx])
+                    for idx in range(size*size)
+                ]
+            # Multiples of 1/1024 add up exactly, so the incremental score does not drift
+            for pion in (Pion.RED, Pion.GREEN):
+                values[pion] = [round(v * 1024) / 1024 for v in values[pion]]
+            self._values[size] = values
+        return self._values[size]
+
+    def features(self, size: int, pions):
+        # {Pion.RED: [..], Pion.GREEN: [..]} feature values, pions has one value per cell
+        t = get_tables(size)
+        features = {}
+        for pion in (Pion.RED, Pion.GREEN):
+            f = features[pion] = [0] * len(FEATURES)
+            f[FREE_GOAL] = sum(t.goal[pion])
+            for idx, p in enumerate(pions):
+                if p == pion:
+                    f[DISTANCE] += t.distance[pion][idx]
+                    f[SPREAD] += t.spread[pion][idx]
+                    f[HOME] += t.goal[pion][idx]
+                    f[BLOCKED] += t.start[pion][idx]
+                if p != Pion.NONE:
+                    f[FREE_GOAL] -= t.goal[pion][idx]
+        return features
+
+    def score(self, size: int, pions):
+        # Full evaluation, Board keeps it up to date in move_pion
+        values = self.values(size)
+        return sum(values[p][idx] for idx, p in enumerate(pions))
+
+    def score_features(self, features: dict):
+        return sum(c * (g - r) for c, g, r in zip(self.coef, features[Pion.GREEN], features[Pion.RED]))
+
+    # Batch mode (NumPy), features and scores of many positions in one call, used for offline tuning
+
+    def batch_features(self, size: int, states):
+        # states: (B, size*size) pion values -> (B, 2, len(FEATURES)) features, [:, 0] red, [:, 1] green
+        import numpy as np
+        t = get_tables(size)
+        states = np.asarray(states)
+        out = np.empty((states.shape[0], 2, len(FEATURES)), dtype=np.float64)
+        occupied = (states != Pion.NONE).astype(np.float64)
+        for side, pion in enumerate((Pion.RED, Pion.GREEN)):
+            mine = (states == pion).astype(np.float64)
+            goal = np.array(t.goal[pion], dtype=np.float64)
+            out[:, side, DISTANCE] = mine @ np.array(t.distance[pion], dtype=np.float64)
+            out[:, side, SPREAD] = mine @ np.array(t.spread[pion], dtype=np.float64)
+            out[:, side, HOME] = mine @ goal
+            out[:, side, BLOCKED] = mine @ np.array(t.start[pion], dtype=np.float64)
+            out[:, side, FREE_GOAL] = goal.sum() - occupied @ goal
+        return out
+
+    def batch_score(self, size: int, states):
+        # Scores of many positions, (B, size*size) pion values -> (B,)
+        import numpy as np
+        values = self.values(size)
+        table = np.array([values[Pion.NONE], values[Pion.RED], values[Pion.GREEN]])
+        states = np.asarray(states, dtype=np.intp)
+        return table[states, np.arange(size*size)].sum(axis=1)
+
+@lru_cache(maxsize=None)
+def default_evaluator():
+    return Evaluator.load()
+
+def get_evaluator(spec):
+    # "default": config weights, None/"cost": plain distance cost, other strings: a weights file
+    if spec is None or isinstance(spec, Evaluator):
+        return spec
+    if spec == "cost":
+        return None
+    if spec == "default":
+        return default_evaluator()
+    return Evaluator.load(spec)
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from model.cell import CellType
+
+DIRECTIONS = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,1), (1,-1), (-1,-1)]
+
+class Geometry:
+    # Board-size dependent tables, cells are addressed by flat index row*size+col
+    def __init__(self, size: int):
+        n = size
+        self.size = size
+        self.owner = [self.cell_owner(i, j) for i in range(n) for j in range(n)]
+        # row + col, progress along the diagonal
+        self.diag = [i + j for i in range(n) for j in range(n)]
+        # Step targets and jump (midpoint, target) pairs
+        self.steps = [[] for _ in range(n*n)]
+        self.jumps = [[] for _ in range(n*n)]
+        for dr, dc in DIRECTIONS:
+            for idx in range(n*n):
+                row, col = divmod(idx, n)
+                if 0 <= row+dr < n and 0 <= col+dc < n:
+                    self.steps[idx].append(idx + dr*n + dc)
+                    if 0 <= row+2*dr < n and 0 <= col+2*dc < n:
+                        self.jumps[idx].append((idx + dr*n + dc, idx + 2*(dr*n + dc)))
+        # Bitmask versions for BitBoard: single step targets per cell, and per direction the
+        # cells a jump may start from (two cells of room)
+        self.step_mask = [0] * (n*n)
+        for idx in range(n*n):
+            for to in self.steps[idx]:
+                self.step_mask[idx] |= 1 << to
+        self.jump_shifts = []
+        for dr, dc in DIRECTIONS:
+            guard = 0
+            for idx in range(n*n):
+                row, col = divmod(idx, n)
+                if 0 <= row+2*dr < n and 0 <= col+2*dc < n:
+                    guard |= 1 << idx
+            self.jump_shifts.append((dr*n + dc, guard))
+        # zone[idx]: cells looked at when expanding idx (steps, jump midpoints and targets)
+        self.zone = [0] * (n*n)
+        for idx in range(n*n):
+            for to in self.steps[idx]:
+                self.zone[idx] |= 1 << to
+            for mid, to in self.jumps[idx]:
+                self.zone[idx] |= 1 << to
+        # House masks
+        self.full = (1 << (n*n)) - 1
+        self.house = {CellType.NEUTRAL: 0, CellType.RED_HOUSE: 0, CellType.GREEN_HOUSE: 0}
+        for idx, owner in enumerate(self.owner):
+            self.house[owner] |= 1 << idx
+        # allowed[owner][id][idx]: may a pion of id that started on an owner cell land on idx (see Cell.check)
+        self.allowed = {}
+        for owner in CellType:
+            self.allowed[owner] = {}
+            for id in (CellType.RED_HOUSE, CellType.GREEN_HOUSE):
+                self.allowed[owner][id] = bytearray(
+                    not (owner == CellType.NEUTRAL and o == id or owner != CellType.NEUTRAL and owner != id and o != owner)
+                    for o in self.owner
+                )
+
+    def cell_owner(self, row: int, col: int):
+        # Contraint number
+        d_size = self.size//2
+        c = (d_size-row-1) % self.size
+        # Top-left side
+        if c < d_size and col <= c:
+            return CellType.RED_HOUSE
+        # Bottom-right side
+        elif c >= d_size and col >= c:
+            return CellType.GREEN_HOUSE
+        return CellType.NEUTRAL
+
+    def allowed_mask(self, owner: int, id: int):
+        # Bitmask version of allowed
+        if owner == CellType.NEUTRAL:
+            return self.full & ~self.house[id]
+        if owner != id:
+            return self.house[owner]
+        return self.full
+
+@lru_cache(maxsize=None)
+def get_geometry(size: int):
+    return Geometry(size)
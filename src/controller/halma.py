@@ -1,146 +1,343 @@
+from array import array
 from collections import deque
 from model.cell import Cell, CellType, Pion
 from model.player import Player
-import math, sys, time, random
-import numpy as np
+import logging, math, sys, time, random
+from .geometry import get_geometry
+from .zobrist import get_zobrist
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .time_manager import TimeManager
+from .stats import SearchResult, SearchStats
+from .evaluation import get_evaluator
+from .book import OpeningBook, get_book
+from .race import RaceSolver
+from .mcts import MCTS
+from .settings import local_settings
+from .snapshot import SNAPSHOT, HAS_COUNTERS
+from exception import SearchTimeout
+
+logger = logging.getLogger(__name__)
+
+# Pion of a cell byte
+PIONS = (Pion.NONE, Pion.RED, Pion.GREEN)
 
 class Board:
-    def __init__(self, size, max_depth=1, max_time=-1, prune=True):
+    def __init__(self, size, max_depth=1, max_time=-1, prune=True, tt_size_mb=16, ordering=True, game_time=None,
+                 move_cache=True, evaluator="default", batch_leaves=True, book="default",
+                 race=True):
         assert(size & 1 == 0)
         self.max_depth = max_depth
         self.max_time = max_time
-        self.prune = False
+        # prune=False, ordering=False is the plain minimax search
+        self.prune = prune
+        self.ordering = ordering
         self.timer = 0
-        self.cost = 0
         self.size = size
-        self.count_finish_red = 0
-        self.count_finish_green = 0
+        # Keep per-pion step lists between apply_move/undo_move
+        self.use_move_cache = move_cache
+        # Feature evaluation ("default" config weights, a weights file, an Evaluator, or None for the plain cost)
+        # batch_leaves: score all children of a frontier node at once from the per pion values
+        self.evaluator = get_evaluator(evaluator)
+        self.batch_leaves = batch_leaves and self.evaluator is not None
         self.gen_board()
         self.set_count_pion()
+        # Search counters and an optional hook called with SearchStats after every iteration
         self.child = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.stats_callback = None
+        # Per-move budget from max_time and the optional whole-game clock
+        self.time_manager = TimeManager(game_time)
+        self.root_best = None
+        self.root_first = None
+        # Transposition table, kept for the whole game
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        # Opening book ("default" shipped book of the size, a book file, an OpeningBook, or None)
+        self.book = get_book(size) if book == "default" else OpeningBook(book) if isinstance(book, str) else book
+        # Endgame race solver, used once the armies are separated
+        self.race = RaceSolver(self) if race else None
+        # Monte Carlo search tree and its settings, kept between moves
+        self.tree = None
+        self.tree_settings = None
+        # Position keys of the game so far (see GameState), None when unknown. The search scores
+        # a position met again, in the game or on the search path, as draw_score
+        self.repetitions = None
+        self.search_path = set()
+        self.draw_score = 0
+        # Move ordering heuristics
+        self.killers = []
+        self.history = {}
+        self.pv_move = None
 
     def __getitem__(self, index):
         try:
-            return self.cells[index[0], index[1]]
+            return self.cells[index[0]][index[1]]
         except Exception:
             return None
 
     def gen_board(self):
-        self.cells = np.empty((self.size, self.size), dtype=Cell)
-        for i in range(self.size):
-            # Contraint number
-            d_size = self.size//2
-            c = (d_size-i-1) % self.size
-            # Gen row
-            for j in range(self.size):
-                owner = CellType.NEUTRAL
-                # Top-left side
-                if c < d_size and j <= c:
-                    owner = CellType.RED_HOUSE
-                # Bottom-right side
-                elif c >= d_size and j >= c:
-                    owner = CellType.GREEN_HOUSE
-                self.cells[i, j] = Cell(owner, owner, i, j)
+        self.geo = get_geometry(self.size)
+        # One list of cells per row
+        owner = self.geo.owner
+        n = self.size
+        self.cells = [[Cell(owner[i*n + j], owner[i*n + j], i, j) for j in range(n)] for i in range(n)]
+        # Flat view of the same cells, indexed by row*size+col
+        self.flat = [cell for row in self.cells for cell in row]
+        self.zobrist = get_zobrist(self.size)
+        self.refresh()
+
+    def refresh(self, counters=None):
+        # Recompute every incremental value from the cells, counters: (red finished, green finished,
+        # cost, hash) of the cells when already known (snapshot header)
+        n = self.size
+        if counters is not None:
+            self.count_finish_red, self.count_finish_green, self.cost, self.hash = counters
+        else:
+            self.cost = 0
+            self.count_finish_red = 0
+            self.count_finish_green = 0
+            for cell in self.flat:
+                if cell.pion == Pion.RED:
+                    self.cost += (n - cell.row - 1) + (n - cell.col - 1)
+                    self.count_finish_red += cell.owner == CellType.GREEN_HOUSE
+                elif cell.pion == Pion.GREEN:
+                    self.cost -= cell.row + cell.col
+                    self.count_finish_green += cell.owner == CellType.RED_HOUSE
+            # Zero at the starting position
+            for cell in self.flat:
+                if cell.owner == CellType.RED_HOUSE:
+                    self.cost -= (n - cell.row - 1) + (n - cell.col - 1)
+                elif cell.owner == CellType.GREEN_HOUSE:
+                    self.cost += cell.row + cell.col
+            # Incremental zobrist hash
+            self.hash = self.zobrist.hash_cells(self.flat)
+        # Pion positions and the per-pion move cache
+        self.pieces = {Player.RED: set(), Player.GREEN: set()}
+        for idx, cell in enumerate(self.flat):
+            if cell.pion != Pion.NONE:
+                self.pieces[cell.pion].add(idx)
+        # occ: occupancy bitmask, a cached entry is valid while occ & deps is unchanged
+        self.occ = 0
+        for idx in self.pieces[Player.RED] | self.pieces[Player.GREEN]:
+            self.occ |= 1 << idx
+        self.move_cache = {}
+        # Evaluation score and per pion values, updated in move_pion
+        if self.evaluator is not None:
+            self.eval_values = self.evaluator.values(n)
+            self.score = self.evaluator.score(n, [cell.pion for cell in self.flat])
+
+    def encode(self):
+        # Compact state: board size then one byte per cell
+        return bytes([self.size]) + bytes(cell.pion for cell in self.flat)
+
+    def set_state(self, pions):
+        # Load one pion value per cell (same order as encode) and rebuild derived values
+        for cell, pion in zip(self.flat, pions):
+            cell.pion = Pion(pion)
+        self.refresh()
+
+    @classmethod
+    def decode(cls, state, **kwargs):
+        board = cls(state[0], **kwargs)
+        board.set_state(state[1:])
+        return board
+
+    def write_snapshot(self, buf, id: int = None):
+        # Snapshot of the position into buf (see controller/snapshot.py), id: side to move
+        SNAPSHOT.pack_into(buf, 0, self.size, id or 0, HAS_COUNTERS, self.count_finish_red, self.count_finish_green,
+                           self.cost, self.hash)
+        buf[SNAPSHOT.size:SNAPSHOT.size + len(self.flat)] = bytes(cell.pion for cell in self.flat)
+
+    def load_snapshot(self, buf):
+        # Position of a snapshot of the same board size, the counters come from its header.
+        # Returns the side to move, None when not stored
+        size, id, flags, red, green, cost, hash = SNAPSHOT.unpack_from(buf, 0)
+        if size != self.size:
+            raise ValueError("snapshot of a size %d board" % size)
+        for cell, pion in zip(self.flat, bytes(buf[SNAPSHOT.size:SNAPSHOT.size + len(self.flat)])):
+            cell.pion = PIONS[pion]
+        self.refresh((red, green, cost, hash) if flags & HAS_COUNTERS else None)
+        return Player(id) if id else None
+
+    @classmethod
+    def from_snapshot(cls, buf, **kwargs):
+        board = cls(buf[0], **kwargs)
+        board.load_snapshot(buf)
+        return board
+
+    def copy(self):
+        # Same settings and position for a search in another thread, sharing the
+        # transposition table, evaluator and book (the race solver and move cache are its own)
+        board = type(self)(self.size, max_depth=self.max_depth, max_time=self.max_time, prune=self.prune,
+                           tt_size_mb=0, ordering=self.ordering, move_cache=self.use_move_cache,
+                           evaluator=self.evaluator, batch_leaves=self.batch_leaves, book=self.book,
+                           race=self.race is not None)
+        board.tt = self.tt
+        board.repetitions = self.repetitions
+        board.set_state([cell.pion for cell in self.flat])
+        return board
 
     def set_count_pion(self):
         self.count_pion = 0
         for i in range(self.size//2, 0, -1):
             self.count_pion += i
 
-    def go_everywhere(self, cell: Cell, possible_steps, s, original: Cell, id: int):
-        steps = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,1), (1,-1), (-1,-1)]
-        # Try all move (left, right, up, down, etc..)
-        for step in steps:
-            row = cell.row + step[0]
-            col = cell.col + step[1]
-            # If feasible
-            if row >= 0 and col >= 0 and row < self.size and col < self.size:
-                # Is it emptpy to put the pion?
-                if self[row, col].pion == Pion.NONE:
-                    # Do not repeat same move and do not put to stack
-                    if cell == original and self[row, col].check(original, id) and (original, self[row, col]) not in possible_steps:
-                        possible_steps.append((original, self[row, col]))
-                else: # Try jump/skip to next empty cell
-                    row = cell.row + step[0]*2
-                    col = cell.col + step[1]*2
-                    # If feasible
-                    if row >= 0 and col >= 0 and row < self.size and col < self.size:
-                        # Check empty and do not repeat same move
-                        if self[row, col].check(original, id) and (original, self[row, col]) not in possible_steps:
-                            possible_steps.append((original, self[row, col]))
-                            s.append(self[row, col])
+    def reachable(self, origin: int, id: int):
+        # Generate every target index of the pion on origin, each landing cell is visited once
+        flat = self.flat
+        allowed = self.geo.allowed[flat[origin].owner][id]
+        # Single step only from the original cell
+        for to in self.geo.steps[origin]:
+            if flat[to].pion == Pion.NONE and allowed[to]:
+                yield to
+        # Jump/skip chain
+        jumps = self.geo.jumps
+        visited = {origin}
+        s = [origin]
+        while s:
+            idx = s.pop()
+            for mid, to in jumps[idx]:
+                if to not in visited and flat[mid].pion != Pion.NONE and flat[to].pion == Pion.NONE and allowed[to]:
+                    visited.add(to)
+                    s.append(to)
+                    yield to
 
     def dfs_path(self, row: int, col: int, id: int):
-        possible_steps = []
-        s = deque()
-        original = self[row, col]
-        s.append(original)
-        while s:
-            cell = s.pop()
-            self.go_everywhere(cell, possible_steps, s, original, id)
+        origin = row*self.size + col
+        original = self.flat[origin]
+        return [(original, self.flat[to]) for to in self.reachable(origin, id)]
+
+    def piece_steps(self, origin: int, id: int):
+        # Moves of one pion and the bitmask of cells whose occupancy they depend on
+        geo = self.geo
+        neighbors = geo.steps[origin]
+        steps = array("I")
+        deps = 1 << origin | geo.zone[origin]
+        base = origin << 16
+        for to in self.reachable(origin, id):
+            steps.append(base | to)
+            # Jump landings are expanded too
+            if to not in neighbors:
+                deps |= geo.zone[to]
+        return steps, deps
+
+    def cached_steps(self, idx: int, id: int):
+        # Cache entry (moves, deps, occ & deps, id, stuck) of the pion on idx, rebuilt only
+        # when a cell it depends on changed, so apply_move/undo_move have nothing to invalidate
+        entry = self.move_cache.get(idx)
+        if entry is None or entry[3] != id or self.occ & entry[1] != entry[2]:
+            steps, deps = self.piece_steps(idx, id)
+            # Stuck pion in its own house, counted for the draw check
+            stuck = not steps and self.flat[idx].owner == id
+            entry = self.move_cache[idx] = (steps, deps, self.occ & deps, id, stuck)
+        return entry
+
+    # The search works on moves packed as from index << 16 | to index (see step_key) kept in
+    # array("I") lists, (Cell, Cell) steps are only built for callers outside the search
+
+    def gen_moves(self, id: int):
+        possible_steps = array("I")
+        stuck = 0
+        if self.use_move_cache:
+            for idx in self.pieces[id]:
+                entry = self.cached_steps(idx, id)
+                possible_steps.extend(entry[0])
+                stuck += entry[4]
+        else:
+            for idx in self.pieces[id]:
+                # Generate step for a certain pion
+                steps = self.piece_steps(idx, id)[0]
+
+                # Check if stuck (no possible step for a certain pion)
+                if not steps:
+                    # Check if the player's pion stuck in its own house
+                    stuck += self.flat[idx].owner == id
+                possible_steps.extend(steps)
+
+        # If it's draw return None
+        if self.is_draw(id, stuck):
+            return None
         return possible_steps
 
     def gen_all_pos_steps(self, id: int):
-        possible_steps = deque()
-        stuck = 0
-        for row in range(self.size):
-            d_size = self.size//2
-            c = (d_size-row-1) % self.size
-            for col in range(self.size):
-                if self[row, col].pion == id:
-                    # Generate step for a certain pion
-                    steps = self.dfs_path(row, col, id)
-
-                    # Check if stuck (no possible step for a certain pion)
-                    if not steps:
-                        # Check if the player's pion stuck in its own house
-                        stuck += (id == Player.GREEN and c >= d_size and col >= c) or (id == Player.RED and c < d_size and col <= c)
-                    possible_steps.extend(steps)
+        moves = self.gen_moves(id)
+        if moves is None:
+            return None
+        return deque(self.to_step(move) for move in moves)
+
+    def to_step(self, move: int):
+        return (self.flat[move >> 16], self.flat[move & 0xffff])
 
+    def step_key(self, step: tuple):
+        # (from index, to index) packed in one int
+        return (step[0].row*self.size + step[0].col) << 16 | (step[1].row*self.size + step[1].col)
+
+    def is_draw(self, id: int, stuck: int):
         # Check if house is full with player's stuck pion + enemy's pion
-        # If yes, it's draw so return None
-        if (
+        return (
             id == Player.GREEN and stuck == self.count_pion-self.count_finish_red or
             id == Player.RED and stuck == self.count_pion-self.count_finish_green
-        ):
-            return None
-        return possible_steps
+        )
 
-    def apply_step(self, step: tuple):
-        # Pre-condition: step[0].pion != Pion.NONE and step[1].pion == Pion.NONE
-        # Win condition update + cost update
-        if step[0].pion == Pion.RED:
-            self.cost -= (self.size - step[0].row -1) + (self.size - step[0].col -1)
-            self.cost += (self.size - step[1].row -1) + (self.size - step[1].col -1)
-            self.count_finish_red += step[0].owner != CellType.GREEN_HOUSE and step[1].owner == CellType.GREEN_HOUSE
-        elif step[0].pion == Pion.GREEN:
-            self.cost += step[0].row + step[0].col
-            self.cost -= step[1].row + step[1].col
-            self.count_finish_green += step[0].owner != CellType.RED_HOUSE and step[1].owner == CellType.RED_HOUSE
+    def apply_move(self, move: int):
+        # Pre-condition: the from cell holds a pion and the to cell is empty
+        a = move >> 16
+        b = move & 0xffff
+        src = self.flat[a]
+        dst = self.flat[b]
+        # Win condition update + cost update, the same for both colors:
+        # red's cost is its distance to the bottom-right corner, green's is minus its distance to the top-left
+        diag = self.geo.diag
+        self.cost += diag[a] - diag[b]
+        if src.pion == Pion.RED:
+            self.count_finish_red += src.owner != CellType.GREEN_HOUSE and dst.owner == CellType.GREEN_HOUSE
+        elif src.pion == Pion.GREEN:
+            self.count_finish_green += src.owner != CellType.RED_HOUSE and dst.owner == CellType.RED_HOUSE
         # Apply step
-        step[1].pion = step[0].pion
-        step[0].pion = Pion.NONE
+        self.move_pion(a, b)
 
-    def undo_step(self, step: tuple):
-        # Pre-condition: step[0].pion == Pion.NONE and step[1].pion != Pion.NONE
-        # Win condition update + cost update
-        if step[1].pion == Pion.RED:
-            self.cost += (self.size - step[0].row -1) + (self.size - step[0].col -1)
-            self.cost -= (self.size - step[1].row -1) + (self.size - step[1].col -1)
-            self.count_finish_red -= step[0].owner != CellType.GREEN_HOUSE and step[1].owner == CellType.GREEN_HOUSE
-        elif step[1].pion == Pion.GREEN:
-            self.cost -= step[0].row + step[0].col
-            self.cost += step[1].row + step[1].col
-            self.count_finish_green -= step[0].owner != CellType.RED_HOUSE and step[1].owner == CellType.RED_HOUSE
+    def undo_move(self, move: int):
+        # Pre-condition: the from cell is empty and the to cell holds the pion
+        a = move >> 16
+        b = move & 0xffff
+        src = self.flat[a]
+        dst = self.flat[b]
+        diag = self.geo.diag
+        self.cost -= diag[a] - diag[b]
+        if dst.pion == Pion.RED:
+            self.count_finish_red -= src.owner != CellType.GREEN_HOUSE and dst.owner == CellType.GREEN_HOUSE
+        elif dst.pion == Pion.GREEN:
+            self.count_finish_green -= src.owner != CellType.RED_HOUSE and dst.owner == CellType.RED_HOUSE
         # Undo step
-        step[0].pion = step[1].pion
-        step[1].pion = Pion.NONE
+        self.move_pion(b, a)
 
+    def apply_step(self, step: tuple):
+        self.apply_move(self.step_key(step))
+
+    def undo_step(self, step: tuple):
+        self.undo_move(self.step_key(step))
+
+    def move_pion(self, a: int, b: int):
+        # Backend hook, move the pion on cell a to the empty cell b
+        src = self.flat[a]
+        dst = self.flat[b]
+        keys = self.zobrist.keys[src.pion]
+        self.hash ^= keys[a] ^ keys[b]
+        if self.evaluator is not None:
+            values = self.eval_values[src.pion]
+            self.score += values[b] - values[a]
+        pieces = self.pieces[src.pion]
+        pieces.remove(a)
+        pieces.add(b)
+        self.occ ^= 1 << a | 1 << b
+        dst.pion = src.pion
+        src.pion = Pion.NONE
 
     def terminal_test(self, depth: int, id: int, maxing: bool):
-        delta = time.time() - self.timer
+        # Abort the whole iteration at the deadline
+        self.time_manager.check()
         # Constraint check
-        if depth == self.max_depth or self.max_time != -1 and delta > self.max_time:
+        if depth == self.max_depth:
             return None
         # Switch player
         if not maxing:
@@ -149,7 +346,7 @@ class Board:
         if self.count_finish_green == self.count_pion or self.count_finish_red == self.count_pion:
             return None
         # Generate possible steps with DFS
-        steps = self.gen_all_pos_steps(id)
+        steps = self.gen_moves(id)
         if not steps:
             return None
         return steps
@@ -169,60 +366,302 @@ class Board:
             return osc1 if osc1[0] < osc2[0] or osc1[0] == osc2[0] and random.randint(1,2) == 1 else osc2
 
     def objective_function(self, id: int):
-        # Use pre-compute cost (more cheap)
-        total = self.cost
+        # Use pre-compute cost / evaluation score (more cheap)
+        total = self.cost if self.evaluator is None else self.score
         if id == Pion.RED:
             total *= -1
         return total
 
+    def leaf_values(self, steps, id: int):
+        # objective_function after each move, without applying them
+        values = self.eval_values[self.flat[steps[0] >> 16].pion]
+        score = self.score
+        sign = -1 if id == Pion.RED else 1
+        return [sign * (score + values[move & 0xffff] - values[move >> 16]) for move in steps]
+
+    def tt_key(self, id: int, maxing: bool):
+        # Position hash + side to move
+        mover = id if maxing else (id % 2) + 1
+        return self.hash ^ self.zobrist.side if mover == Player.GREEN else self.hash
+
+    def tt_probe(self, key: int, id: int):
+        # Return (depth, flag, value, move) with value and bound seen from id
+        entry = self.tt.probe(key)
+        if entry is None:
+            return None
+        _, depth, flag, value, move, _ = entry
+        # Table values are stored from green's point of view
+        if id == Player.RED:
+            value = -value
+            flag = UPPER if flag == LOWER else LOWER if flag == UPPER else flag
+        return depth, flag, value, move
+
+    def tt_store(self, key: int, id: int, depth: int, flag: int, value: int, move: int):
+        if id == Player.RED:
+            value = -value
+            flag = UPPER if flag == LOWER else LOWER if flag == UPPER else flag
+        self.tt.store(key, depth, flag, value, move)
+
+    def order_steps(self, steps, depth: int, mover: int, tt_move: int):
+        # Sorted so that steps.pop() gives the most promising step first:
+        # tt/pv move, killer moves, then history score and progress toward the goal
+        killers = self.killers[depth] if depth < len(self.killers) else ()
+        history = self.history
+        sign = 1 if mover == Player.RED else -1
+        diag = self.geo.diag
+        def score(move):
+            if move == tt_move:
+                return 1 << 40
+            if move in killers:
+                return (1 << 32) - killers.index(move)
+            progress = (diag[move & 0xffff] - diag[move >> 16]) * sign
+            return (history.get(move, 0) << 8) + progress + 128
+        return sorted(steps, key=score)
+
+    def update_heuristics(self, key: int, depth: int):
+        # Called on a cutoff
+        while len(self.killers) <= depth:
+            self.killers.append([])
+        killers = self.killers[depth]
+        if key not in killers:
+            killers.insert(0, key)
+            del killers[2:]
+        remaining = self.max_depth - depth
+        self.history[key] = self.history.get(key, 0) + remaining * remaining
+
     def legal_moves(self, row: int, col: int, id: int):
         return self.dfs_path(row, col, id)
 
-    # minimax algorithm
-    def minimax(self, id: int):
+    def moves_left(self, id: int):
+        # Rough number of own moves left, a move covers about three cells
+        corner = 2 * (self.size - 1)
+        dist = 0
+        for cell in self.flat:
+            if cell.pion == id:
+                dist += corner - cell.row - cell.col if id == Player.RED else cell.row + cell.col
+        return dist // 3
+
+    def principal_variation(self, id: int, move: int):
+        # Root move followed by the best moves stored in the transposition table
+        pv = []
+        applied = []
+        mover = id
+        while move is not None and len(pv) < self.max_depth:
+            pv.append(divmod(move >> 16, self.size) + divmod(move & 0xffff, self.size))
+            self.apply_move(move)
+            applied.append(move)
+            mover = (mover % 2) + 1
+            entry = None if self.tt is None else self.tt.probe(self.tt_key(mover, True))
+            if entry is None or entry[4] is None:
+                break
+            move = entry[4]
+            # Guard against hash collisions
+            if self.flat[move >> 16].pion != mover or self.flat[move & 0xffff].pion != Pion.NONE:
+                move = None
+        for move in reversed(applied):
+            self.undo_move(move)
+        return pv
+
+    def book_move(self, id: int):
+        # Book move of the position, None when out of book
+        if self.book is None:
+            return None
+        move = self.book.probe(self.tt_key(id, True))
+        if move is None:
+            return None
+        src, dst = move >> 16, move & 0xffff
+        # Guard against hash collisions
+        if src >= len(self.flat) or self.flat[src].pion != id or dst not in self.reachable(src, id):
+            return None
+        return move
+
+    def race_move(self, id: int):
+        # First move of the shortest finish when the game is a pure race, None otherwise
+        if self.race is None:
+            return None
+        res = self.race.solve(id)
+        if res is None:
+            return None
+        logger.info("race: %d moves to finish, %d nodes", res[0], self.race.nodes)
+        return res[1]
+
+    def known_move(self, id: int):
+        # Book or race move as a search result, None when the position needs a search
+        move = self.book_move(id)
+        engine = "book"
+        if move is None:
+            move = self.race_move(id)
+            engine = "race"
+        if move is None:
+            return None
+        self.pv_move = move
+        logger.info("%s move %s", engine, divmod(move >> 16, self.size) + divmod(move & 0xffff, self.size))
+        return SearchResult(self.objective_function(id), self.to_step(move), SearchStats(engine, id))
+
+    # stop: optional StopToken, a cancelled search returns its best step so far
+    def iterative_deepening(self, id: int, search, engine: str, stop=None):
+        res = self.known_move(id)
+        if res is not None:
+            return res
+        tm = self.time_manager
         self.timer = time.time()
-        self.child = 0
+        tm.start(id, self.max_time, self.moves_left(id), stop)
+        stats = SearchStats(engine, id)
         # save and reset max_depth
         default_max_depth = self.max_depth
         self.max_depth = 0
-        opt_step_cost_list = []
-        # try using iterative deepening approach
-        while True:
-            self.max_depth += 1
-            print("Try using max_depth =", self.max_depth)
-            st = time.time()
-            res = self.minimax_rec(id, True, 0, None, -sys.maxsize, sys.maxsize)
-            opt_step_cost_list.append(res)
-            ed = time.time()
-            print("Done in", ed - st, "second.", opt_step_cost_list[-1])
-            # check time
-            delta = time.time() - self.timer
-            if delta > self.max_time:  # time up
-                break
-        # reset max_depth to the default value
-        self.max_depth = default_max_depth
-        # return
-        if len(opt_step_cost_list) > 1:
-            return opt_step_cost_list[-2]
+        opt_step_cost = None
+        last = before_last = 0
+        try:
+            while True:
+                self.max_depth += 1
+                self.root_best = None
+                self.root_first = None
+                stats.begin(self, self.max_depth)
+                opt_step_cost = search()
+                if opt_step_cost[1] is not None:
+                    self.pv_move = opt_step_cost[1]
+                stats.end(self, opt_step_cost[0], self.principal_variation(id, opt_step_cost[1]), True)
+                self.report(stats)
+                before_last, last = last, stats.depths[-1].time
+                # Stop at the depth limit without a time budget, or when the next iteration won't finish
+                if opt_step_cost[1] is None or tm.budget is None and self.max_depth >= default_max_depth:
+                    break
+                if not tm.can_deepen(last, before_last):
+                    break
+        except SearchTimeout:
+            # Partial iteration is safe once the previous best step was searched first and finished
+            if self.root_best is not None and (opt_step_cost is None or self.root_first == self.pv_move):
+                opt_step_cost = self.root_best
+            stats.end(self, None, [], False)
+            self.report(stats)
+        finally:
+            # reset max_depth to the default value
+            self.max_depth = default_max_depth
+            tm.finish()
+        if opt_step_cost is None:
+            # Not even one step finished, take any legal step
+            steps = self.gen_moves(id)
+            opt_step_cost = (self.objective_function(id), steps[0] if steps else None)
+        # Back to (Cell, Cell) for the caller
+        step = None if opt_step_cost[1] is None else self.to_step(opt_step_cost[1])
+        return SearchResult(opt_step_cost[0], step, stats)
+
+    def report(self, stats: SearchStats):
+        d = stats.depths[-1]
+        if d.completed:
+            logger.info("%s depth %d: value %s, %d nodes in %.3f s (%.0f nps), cutoff rate %.2f, pv %s",
+                        stats.engine, d.depth, d.value, d.nodes, d.time, d.nps, d.cutoff_rate, d.pv)
         else:
-            return opt_step_cost_list[-1]
+            logger.info("%s depth %d: time up after %d nodes", stats.engine, d.depth, d.nodes)
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    # minimax algorithm
+    def minimax(self, id: int, stop=None):
+        self.child = self.leaves = self.cutoffs = 0
+        if self.tt is not None:
+            self.tt.new_search()
+        # Fresh killers, aged history
+        self.killers = []
+        self.history = {key: value >> 1 for key, value in self.history.items() if value > 1}
+        self.pv_move = None
+        self.search_path = set()
+        # try using iterative deepening approach
+        return self.iterative_deepening(id, lambda: self.minimax_rec(id, True, 0, None, -sys.maxsize, sys.maxsize), "minimax", stop)
+
+    def repeated(self, id: int, maxing: bool):
+        # Position already met in the game or on the search path
+        key = self.tt_key(id, maxing)
+        return key in self.repetitions or key in self.search_path
+
+    def repeated_children(self, steps, mover: int, values: list):
+        # Frontier children already met get the draw score, keys computed without applying the moves
+        keys = self.zobrist.keys[mover]
+        # The other side is on the move in the children
+        base = self.hash ^ self.zobrist.side if mover == Player.RED else self.hash
+        for i, move in enumerate(steps):
+            key = base ^ keys[move >> 16] ^ keys[move & 0xffff]
+            if key in self.repetitions or key in self.search_path:
+                values[i] = self.draw_score
 
     def minimax_rec(self, id: int, maxing: bool, depth: int, step: tuple, a: int, b: int):
         self.child += 1
+        if depth > 0 and self.repetitions is not None and self.repeated(id, maxing):
+            self.leaves += 1
+            return (self.draw_score, step)
         steps = self.terminal_test(depth, id, maxing)
         if steps is None:
+            self.leaves += 1
             return (self.objective_function(id), step)
 
+        # Transposition table lookup
+        tt_move = None
+        if self.tt is not None:
+            key = self.tt_key(id, maxing)
+            entry = self.tt_probe(key, id)
+            if entry is not None:
+                tt_depth, flag, value, tt_move = entry
+                if depth > 0 and tt_depth >= self.max_depth - depth:
+                    if flag == EXACT:
+                        self.leaves += 1
+                        return (value, step)
+                    if self.prune:
+                        if flag == LOWER:
+                            a = a if a >= value else value
+                        else:
+                            b = b if b <= value else value
+                        if a >= b:
+                            self.leaves += 1
+                            return (value, step)
+        if depth == 0 and tt_move is None:
+            tt_move = self.pv_move
+        a0, b0 = a, b
+
+        # Move ordering
+        if self.ordering:
+            steps = self.order_steps(steps, depth, id if maxing else (id % 2) + 1, tt_move)
+        elif tt_move is not None:
+            for i, s in enumerate(steps):
+                if s == tt_move:
+                    del steps[i]
+                    steps.append(s)
+                    break
+
+        # Children of a frontier node are all leaves, score them at once
+        leaf_values = None
+        if self.batch_leaves and depth == self.max_depth - 1:
+            leaf_values = self.leaf_values(steps, id)
+            if self.repetitions is not None:
+                self.repeated_children(steps, id if maxing else (id % 2) + 1, leaf_values)
+        if self.repetitions is not None:
+            self.search_path.add(self.tt_key(id, maxing))
+
         opt_step_cost = self.init_step_cost(maxing)
         while steps:
             step = steps.pop()
-            self.apply_step(step)
-
-            # Apply minimax to current state
-            res = self.minimax_rec(id, not maxing, depth+1, step, a, b)
-            opt_step_cost = self.optimize_step_cost(maxing, opt_step_cost, (res[0], step))
-
-            self.undo_step(step)
+            if leaf_values is not None:
+                self.child += 1
+                self.leaves += 1
+                res = (leaf_values.pop(), step)
+            else:
+                self.apply_move(step)
+                try:
+                    # Apply minimax to current state
+                    res = self.minimax_rec(id, not maxing, depth+1, step, a, b)
+                finally:
+                    self.undo_move(step)
+            if self.prune:
+                # Bounds are not exact values, only take strictly better steps
+                if maxing and res[0] > opt_step_cost[0] or not maxing and res[0] < opt_step_cost[0]:
+                    opt_step_cost = (res[0], step)
+            else:
+                opt_step_cost = self.optimize_step_cost(maxing, opt_step_cost, (res[0], step))
+            # Best step among the finished root steps
+            if depth == 0:
+                if self.root_first is None:
+                    self.root_first = step
+                self.root_best = opt_step_cost
             # Pruning
             if self.prune:
                 if maxing:
@@ -231,60 +670,73 @@ class Board:
                     b = b if b <= res[0] else res[0]
 
                 if a >= b:
+                    self.cutoffs += 1
+                    self.update_heuristics(step, depth)
                     break
+        if self.repetitions is not None:
+            self.search_path.discard(self.tt_key(id, maxing))
+
+        # Store result
+        if self.tt is not None:
+            value = opt_step_cost[0]
+            flag = UPPER if value <= a0 else LOWER if value >= b0 else EXACT
+            self.tt_store(key, id, self.max_depth - depth, flag, value, opt_step_cost[1])
         return opt_step_cost
 
+    # Monte Carlo tree search, see MCTS for the parameters
+    def mcts(self, id: int, selection: str = "puct", exploration: float = 1.4, rollout: str = "greedy",
+             rollout_depth: int = 8, iterations: int = 2000, stop=None):
+        res = self.known_move(id)
+        if res is not None:
+            return res
+        settings = (selection, exploration, rollout, rollout_depth, iterations)
+        if self.tree is None or self.tree_settings != settings:
+            self.tree = MCTS(self, *settings)
+            self.tree_settings = settings
+        return self.tree.search(id, stop)
+
     # minimax_with_local algorithm (local search using simulated annealing)
     # sample_div: max loop in each minimax level == max(sample_min, len(steps) // sample_div)
-    def minimax_with_local(self, id: int, anneal_threshold: float = 0.9,
-                           sample_min: int = 30, sample_div: float = 1.4):
+    def minimax_with_local(self, id: int, anneal_threshold: float = None,
+                           sample_min: int = None, sample_div: float = None, stop=None):
+        # None: the tuned value of resource/config/search.json
+        settings = local_settings()
+        anneal_threshold = settings["anneal_threshold"] if anneal_threshold is None else anneal_threshold
+        sample_min = settings["sample_min"] if sample_min is None else sample_min
+        sample_div = settings["sample_div"] if sample_div is None else sample_div
         assert 0 <= anneal_threshold <= 1
-        self.timer = time.time()
         # set parameter
-        self.child = 0
+        self.child = self.leaves = self.cutoffs = 0
         self.sample_min = sample_min
         self.sample_div = sample_div
-        # save and reset max_depth
-        default_max_depth = self.max_depth
-        self.max_depth = 0
-        opt_step_cost_list = []
+        self.search_path = set()
         # try using iterative deepening approach
-        while True:
-            self.max_depth += 1
-            print("Try using max_depth =", self.max_depth)
-            st = time.time()
-            res = self.minimax_with_local_rec(id, True, 0, None, -sys.maxsize, sys.maxsize, anneal_threshold)
-            opt_step_cost_list.append(res)
-            ed = time.time()
-            print("Done in", ed - st, "second.", opt_step_cost_list[-1])
-            # check time
-            delta = time.time() - self.timer
-            if delta > self.max_time:  # time up
-                break
-        # reset max_depth to the default value
-        self.max_depth = default_max_depth
-        # return
-        if len(opt_step_cost_list) > 1:
-            return opt_step_cost_list[-2]
-        else:
-            return opt_step_cost_list[-1]
+        return self.iterative_deepening(id, lambda: self.minimax_with_local_rec(id, True, 0, None, -sys.maxsize, sys.maxsize, anneal_threshold), "local", stop)
 
     def minimax_with_local_rec(self, id: int, maxing: bool, depth: int, step: tuple, a: int, b: int, anneal_threshold: float):
         self.child += 1
+        if depth > 0 and self.repetitions is not None and self.repeated(id, maxing):
+            self.leaves += 1
+            return (self.draw_score, step)
         steps = self.terminal_test(depth, id, maxing)
         if steps is None:
+            self.leaves += 1
             return (self.objective_function(id), step)
         max_iter = max(min(self.sample_min, len(steps)), math.floor(len(steps) / self.sample_div))
         steps = deque(random.sample(steps, max_iter))
         T = len(steps)
+        if self.repetitions is not None:
+            self.search_path.add(self.tt_key(id, maxing))
 
         opt_step_cost = self.init_step_cost(maxing)
         while steps:
             step = steps.pop()
-            self.apply_step(step)
-
-            # Apply minimax_with_local to current state
-            res = self.minimax_with_local_rec(id, not maxing, depth+1, step, a, b, anneal_threshold)
+            self.apply_move(step)
+            try:
+                # Apply minimax_with_local to current state
+                res = self.minimax_with_local_rec(id, not maxing, depth+1, step, a, b, anneal_threshold)
+            finally:
+                self.undo_move(step)
             # change current, using annealing
             if maxing:
                 dE = res[0] - opt_step_cost[0]
@@ -307,7 +759,8 @@ class Board:
                     if math.exp(- dE / T) > anneal_threshold:
                         opt_step_cost = (res[0], step)
 
-            self.undo_step(step)
             # update temperature
             T -= 1
+        if self.repetitions is not None:
+            self.search_path.discard(self.tt_key(id, maxing))
         return opt_step_cost
@@ -0,0 +1,248 @@
+import math, random, time
+from model.player import Player
+from .stats import SearchResult, SearchStats
+
+def other(id: int):
+    return Player.GREEN if id == Player.RED else Player.RED
+
+# Rollout policies: pick one of the moves of mover, moves is a non empty array of packed moves
+
+def random_policy(board, moves, mover: int):
+    return moves[random.randrange(len(moves))]
+
+def greedy_policy(board, moves, mover: int):
+    # Longest step toward the goal corner, ties broken at random
+    diag = board.geo.diag
+    sign = 1 if mover == Player.RED else -1
+    best = None
+    best_gain = None
+    ties = 0
+    for move in moves:
+        gain = (diag[move & 0xffff] - diag[move >> 16]) * sign
+        if best_gain is None or gain > best_gain:
+            best, best_gain, ties = move, gain, 1
+        elif gain == best_gain:
+            ties += 1
+            if random.randrange(ties) == 0:
+                best = move
+    return best
+
+def eval_policy(board, moves, mover: int):
+    # Best move by the board evaluation, one ply deep
+    if board.evaluator is None:
+        return greedy_policy(board, moves, mover)
+    values = board.leaf_values(moves, mover)
+    return moves[max(range(len(moves)), key=values.__getitem__)]
+
+ROLLOUT_POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "eval": eval_policy,
+}
+
+class Node:
+    # mover made move to reach this node, value sums rewards from the mover's point of view
+    __slots__ = ("move", "mover", "key", "parent", "children", "untried", "visits", "value", "prior")
+
+    def __init__(self, move, mover: int, key: int, parent=None, prior: float = 1.0):
+        self.move = move
+        self.mover = mover
+        self.key = key
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.value = 0.0
+        self.prior = prior
+
+class MCTS:
+    # Monte Carlo tree search with UCT or PUCT selection and short rollouts scored by the evaluation.
+    # The tree is kept between calls, the next search starts from the node of the position
+    # reached by the moves played in between (found by position key within two plies)
+    def __init__(self, board, selection: str = "puct", exploration: float = 1.4, rollout: str = "greedy",
+                 rollout_depth: int = 8, iterations: int = 2000, eval_scale: float = 10):
+        assert selection in ("uct", "puct")
+        self.board = board
+        self.selection = selection
+        self.exploration = exploration
+        self.policy = ROLLOUT_POLICIES[rollout]
+        self.rollout_depth = rollout_depth
+        # Simulations per search when there is no time budget
+        self.iterations = iterations
+        self.eval_scale = eval_scale
+        self.draw_reward = 0.5
+        self.root = None
+
+    def reuse(self, key: int):
+        # Node of the current position among the root and its first two plies, None if not there
+        if self.root is None:
+            return None
+        if self.root.key == key:
+            return self.root
+        for child in self.root.children:
+            if child.key == key:
+                return child
+            for grandchild in child.children:
+                if grandchild.key == key:
+                    return grandchild
+        return None
+
+    def search(self, id: int, stop=None):
+        board = self.board
+        tm = board.time_manager
+        tm.start(id, board.max_time, board.moves_left(id), stop)
+        board.child = board.leaves = board.cutoffs = 0
+        stats = SearchStats("mcts", id)
+        stats.begin(board, 1)
+        key = board.tt_key(id, True)
+        # Reward for red of a repeated position (Board.draw_score is from id's point of view)
+        self.draw_reward = self.squash(board.draw_score if id == Player.RED else -board.draw_score)
+        root = self.reuse(key)
+        if root is None:
+            root = Node(None, other(id), key)
+        # Drop the rest of the old tree
+        root.parent = None
+        self.root = root
+        iterations = 0
+        while not tm.cancelled:
+            if tm.budget is None:
+                if iterations >= self.iterations:
+                    break
+            elif time.time() >= tm.deadline:
+                break
+            self.simulate(root, id)
+            iterations += 1
+        tm.finish()
+        if not root.children:
+            stats.end(board, None, [], False)
+            board.report(stats)
+            return SearchResult(board.objective_function(id), None, stats)
+        best = max(root.children, key=lambda node: node.visits)
+        pv = []
+        node = best
+        while node is not None and len(pv) < 8:
+            pv.append(divmod(node.move >> 16, board.size) + divmod(node.move & 0xffff, board.size))
+            node = max(node.children, key=lambda child: child.visits) if node.children else None
+        # Reported on the evaluation scale like the other engines, not as a win rate
+        value = self.unsquash(best.value / best.visits)
+        stats.end(board, value, pv, True)
+        board.report(stats)
+        board.pv_move = best.move
+        return SearchResult(value, board.to_step(best.move), stats)
+
+    def simulate(self, root: Node, id: int):
+        # One selection, expansion, rollout and backup pass
+        board = self.board
+        node = root
+        path = []
+        # Position keys from the root down, a position met again in the game or on them is a draw
+        seen = {root.key}
+        repeated = False
+        while True:
+            if node.untried is None:
+                self.expand(node)
+            if node.untried:
+                # UCT: add one child per visit
+                move = node.untried.pop()
+                node = Node(move, other(node.mover), None, node)
+                node.parent.children.append(node)
+            elif node.children:
+                node = self.select(node)
+            else:
+                # Finished game or no move
+                break
+            board.apply_move(node.move)
+            path.append(node.move)
+            if node.key is None:
+                node.key = board.tt_key(other(node.mover), True)
+            if board.repetitions is not None:
+                repeated = node.key in board.repetitions or node.key in seen
+                if repeated:
+                    break
+                seen.add(node.key)
+            if node.visits == 0:
+                break
+        board.child += 1
+        # Rollout, reward for red
+        reward = self.draw_reward if repeated else self.rollout(other(node.mover), path, seen)
+        for move in reversed(path):
+            board.undo_move(move)
+        # Backup
+        while node is not None:
+            node.visits += 1
+            node.value += reward if node.mover == Player.RED else 1 - reward
+            node = node.parent
+
+    def expand(self, node: Node):
+        # Moves of a node reached for the first time: UCT adds them one by one in random order,
+        # PUCT adds them all at once with priors from their progress toward the goal
+        board = self.board
+        mover = other(node.mover)
+        node.untried = []
+        if board.count_finish_red == board.count_pion or board.count_finish_green == board.count_pion:
+            return
+        moves = board.gen_moves(mover)
+        if not moves:
+            return
+        if self.selection == "uct":
+            node.untried = list(moves)
+            random.shuffle(node.untried)
+            return
+        diag = board.geo.diag
+        sign = 1 if mover == Player.RED else -1
+        gains = [(diag[move & 0xffff] - diag[move >> 16]) * sign for move in moves]
+        top = max(gains)
+        weights = [math.exp(gain - top) for gain in gains]
+        total = sum(weights)
+        node.children = [Node(move, mover, None, node, weight / total) for move, weight in zip(moves, weights)]
+
+    def select(self, node: Node):
+        c = self.exploration
+        if self.selection == "uct":
+            log_n = math.log(node.visits)
+            return max(node.children, key=lambda child:
+                       child.value / child.visits + c * math.sqrt(log_n / child.visits))
+        # Unvisited children count as a draw
+        sqrt_n = math.sqrt(node.visits)
+        return max(node.children, key=lambda child:
+                   (child.value / child.visits if child.visits else 0.5) + c * child.prior * sqrt_n / (1 + child.visits))
+
+    def squash(self, value: float):
+        # Evaluation from red's point of view to a reward in (0, 1)
+        return 1 / (1 + math.exp(-value / self.eval_scale))
+
+    def unsquash(self, reward: float):
+        # Inverse of squash, a reward of 0 or 1 (a solved game) is clamped to a finite evaluation
+        reward = min(max(reward, 1e-6), 1 - 1e-6)
+        return self.eval_scale * math.log(reward / (1 - reward))
+
+    def rollout(self, mover: int, path: list, seen: set):
+        # Play rollout_depth plies with the rollout policy (applied moves are added to path),
+        # then score: 1 or 0 on a finished game, the draw reward on a repeated position (seen:
+        # keys of the tree path), else the evaluation squashed to (0, 1)
+        board = self.board
+        for _ in range(self.rollout_depth):
+            if board.count_finish_red == board.count_pion:
+                return 1.0
+            if board.count_finish_green == board.count_pion:
+                return 0.0
+            moves = board.gen_moves(mover)
+            if moves is None:
+                return 0.5
+            if not moves:
+                break
+            move = self.policy(board, moves, mover)
+            board.apply_move(move)
+            path.append(move)
+            board.leaves += 1
+            mover = other(mover)
+            if board.repetitions is not None:
+                key = board.tt_key(mover, True)
+                if key in board.repetitions or key in seen:
+                    return self.draw_reward
+                seen.add(key)
+        if board.count_finish_red == board.count_pion:
+            return 1.0
+        if board.count_finish_green == board.count_pion:
+            return 0.0
+        return self.squash(board.objective_function(Player.RED))
@@ -0,0 +1,166 @@
+import multiprocessing, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, wait
+from exception import SearchTimeout
+from .halma import Board
+from .evaluation import Evaluator, FEATURES
+from .stats import SearchResult, SearchStats
+
+# Boards kept alive in each worker process, one per size and search settings, so the worker TT
+# survives between tasks
+_boards = {}
+# Stop token of the worker process, cancelled when the coordinator's search is
+_stop = None
+
+class SharedStop:
+    # StopToken view of a flag shared with the pool
+    def __init__(self, flag):
+        self.flag = flag
+
+    @property
+    def cancelled(self):
+        return self.flag.value != 0
+
+def init_worker(flag):
+    global _stop
+    _stop = SharedStop(flag)
+
+def search_settings(board: Board, tt_size_mb: float):
+    # The coordinator board's switches that change what the search returns, the worker boards are
+    # built with them: the evaluation weights (None for the plain cost) and batch_leaves included
+    weights = None if board.evaluator is None else tuple(board.evaluator.weights)
+    return (tt_size_mb, board.prune, board.ordering, weights, board.batch_leaves)
+
+def worker_board(size: int, settings: tuple):
+    board = _boards.get((size, settings))
+    if board is None:
+        tt_size_mb, prune, ordering, weights, batch_leaves = settings
+        evaluator = None if weights is None else Evaluator(dict(zip(FEATURES, weights)))
+        board = _boards[size, settings] = Board(size, prune=prune, tt_size_mb=tt_size_mb, ordering=ordering,
+                                                evaluator=evaluator, batch_leaves=batch_leaves, book=None, race=False)
+    return board
+
+def search_root_step(state: bytes, id: int, key: int, depth: int, alpha: int, deadline: float, settings: tuple,
+                     history: tuple = None, draw_score: int = 0):
+    # Worker task: value and pv of one root step searched to depth, None if the deadline hit first.
+    # history: position keys of the game (Board.repetitions), None when unknown
+    if time.time() >= deadline or _stop.cancelled:
+        # Queued behind the deadline or a cancel, not started
+        return key, None, [], (0, 0, 0)
+    board = worker_board(state[0], settings)
+    board.set_state(state[1:])
+    board.repetitions = None if history is None else set(history)
+    board.draw_score = draw_score
+    # The root is on the search path, as in the serial search
+    board.search_path = set() if history is None else {board.tt_key(id, True)}
+    board.child = board.leaves = board.cutoffs = 0
+    board.max_depth = depth
+    board.time_manager.start(id, max(deadline - time.time(), 0), 1, _stop)
+    board.time_manager.deadline = deadline
+    board.apply_move(key)
+    try:
+        value = board.minimax_rec(id, False, 1, key, alpha, sys.maxsize)[0]
+    except SearchTimeout:
+        value = None
+    finally:
+        board.undo_move(key)
+    pv = [] if value is None else board.principal_variation(id, key)
+    return key, value, pv, (board.child, board.leaves, board.cutoffs)
+
+class ParallelSearch:
+    # Root splitting: the first (previous best) root step is searched alone to get alpha,
+    # then the other root steps run on the process pool with window (alpha, inf).
+    # Values above alpha are exact, so the merge (strictly best value, then move order)
+    # does not depend on which worker ran what
+    def __init__(self, workers: int = None, tt_size_mb: float = 16):
+        # Set to cancel the root steps running in the workers
+        self.flag = multiprocessing.Value("b", 0, lock=False)
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(self.flag,))
+        self.tt_size_mb = tt_size_mb
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def minimax(self, board: Board, id: int, stop=None):
+        res = board.known_move(id)
+        if res is not None:
+            return res
+        self.flag.value = 0
+        tm = board.time_manager
+        tm.start(id, board.max_time, board.moves_left(id), stop)
+        board.child = board.leaves = board.cutoffs = 0
+        stats = SearchStats("parallel", id)
+        steps = board.gen_moves(id)
+        if not steps:
+            tm.finish()
+            return SearchResult(board.objective_function(id), None, stats)
+        # Best first
+        keys = list(reversed(board.order_steps(steps, 0, id, board.pv_move)))
+        state = board.encode()
+        settings = search_settings(board, self.tt_size_mb)
+        # The game so far, repeated positions are draws in the workers too
+        history = None if board.repetitions is None else tuple(board.repetitions)
+        deadline = tm.deadline
+        opt_step_cost = None
+        depth = 0
+        last = before_last = 0
+        while True:
+            depth += 1
+            stats.begin(board, depth)
+            values = {}
+            pvs = {}
+            def collect(future):
+                # Past the deadline or on a cancel the workers are stopped at their next time check,
+                # the root steps not started yet are dropped
+                while not future.done():
+                    if time.time() >= deadline or stop is not None and stop.cancelled:
+                        self.flag.value = 1
+                        break
+                    wait([future], timeout=0.002)
+                if future.cancelled():
+                    return
+                key, value, pv, counters = future.result()
+                board.child += counters[0]
+                board.leaves += counters[1]
+                board.cutoffs += counters[2]
+                if value is not None:
+                    values[key] = value
+                    pvs[key] = pv
+            collect(self.executor.submit(search_root_step, state, id, keys[0], depth, -sys.maxsize, deadline, settings,
+                                         history, board.draw_score))
+            if keys[0] in values:
+                alpha = values[keys[0]]
+                futures = [
+                    self.executor.submit(search_root_step, state, id, key, depth, alpha, deadline, settings,
+                                         history, board.draw_score)
+                    for key in keys[1:]
+                ]
+                for future in futures:
+                    if self.flag.value:
+                        future.cancel()
+                    collect(future)
+            # Merge in move order, only strictly better values replace the best
+            best = None
+            for key in keys:
+                if key in values and (best is None or values[key] > best[0]):
+                    best = (values[key], key)
+            if len(values) < len(keys):
+                # Partial iteration, safe only when the previous best step finished
+                if best is not None and (opt_step_cost is None or keys[0] in values):
+                    opt_step_cost = best
+                stats.end(board, None, [], False)
+                board.report(stats)
+                break
+            opt_step_cost = best
+            stats.end(board, best[0], pvs[best[1]], True)
+            board.report(stats)
+            # Previous best step first in the next iteration
+            keys.insert(0, keys.pop(keys.index(best[1])))
+            before_last, last = last, stats.depths[-1].time
+            if tm.budget is None and depth >= board.max_depth or not tm.can_deepen(last, before_last):
+                break
+        tm.finish()
+        if opt_step_cost is None:
+            opt_step_cost = (board.objective_function(id), keys[0])
+        board.pv_move = opt_step_cost[1]
+        return SearchResult(opt_step_cost[0], board.to_step(opt_step_cost[1]), stats)
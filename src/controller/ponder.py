@@ -0,0 +1,116 @@
+import logging, threading
+from model.player import Player
+from .stats import SearchResult
+from .time_manager import StopToken
+
+logger = logging.getLogger(__name__)
+
+def other(id: int):
+    return Player.GREEN if id == Player.RED else Player.RED
+
+class Ponder:
+    # Search during the opponent's turn: the likely replies are searched one after the other on a
+    # copy of the board (sharing its transposition table) and the results kept per reply move.
+    # Once the opponent moves, answer() returns the pondered result, waits for the search of the
+    # reply still running, or stops pondering and searches normally with the table already filled
+    def __init__(self, board, max_replies: int = 4):
+        self.board = board
+        self.max_replies = max_replies
+        self.copy = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.halt = threading.Event()
+        self.token = None
+        self.results = {}
+        self.current = None
+
+    def start(self, id: int, engine: str = "minimax"):
+        # id: side to move (the opponent), engine: Board search method playing the other side
+        self.stop()
+        self.copy = self.board.copy()
+        replies = self.likely_replies(id)
+        if not replies:
+            return
+        self.halt.clear()
+        self.token = StopToken()
+        self.results = {}
+        self.thread = threading.Thread(target=self.run, args=(other(id), getattr(self.copy, engine), replies), daemon=True)
+        self.thread.start()
+
+    def likely_replies(self, id: int):
+        # Best move of the last search first, then by the position after one move
+        board = self.copy
+        moves = board.gen_moves(id)
+        if not moves:
+            return []
+        if board.evaluator is not None:
+            values = board.leaf_values(moves, id)
+        else:
+            diag = board.geo.diag
+            sign = 1 if id == Player.RED else -1
+            values = [(diag[move & 0xffff] - diag[move >> 16]) * sign for move in moves]
+        replies = [moves[i] for i in sorted(range(len(moves)), key=values.__getitem__, reverse=True)]
+        entry = None if board.tt is None else board.tt.probe(board.tt_key(id, True))
+        if entry is not None and entry[4] in replies:
+            replies.remove(entry[4])
+            replies.insert(0, entry[4])
+        return replies[:self.max_replies]
+
+    def run(self, id: int, search, replies: list):
+        board = self.copy
+        for move in replies:
+            with self.lock:
+                if self.halt.is_set():
+                    break
+                self.current = move
+            board.apply_move(move)
+            try:
+                res = search(id, stop=self.token)
+            finally:
+                board.undo_move(move)
+            with self.lock:
+                self.results[move] = res
+                self.current = None
+
+    def interrupt(self):
+        self.halt.set()
+        self.token.cancel()
+        self.thread.join()
+
+    def stop(self):
+        if self.thread is not None:
+            self.interrupt()
+            self.thread = None
+        self.results = {}
+
+    def finish(self, move: int, stop=None):
+        # Pondered result for the reply move, None if it was not searched
+        if self.thread is None:
+            return None
+        with self.lock:
+            # No other reply is started, the search of move (if running) goes on
+            self.halt.set()
+            running = move == self.current
+        if running:
+            while self.thread.is_alive():
+                # Cancelled while waiting: stop the pondering search, its best step so far is the answer
+                if stop is not None and stop.cancelled:
+                    self.token.cancel()
+                self.thread.join(0.005)
+        else:
+            self.interrupt()
+        self.thread = None
+        res = self.results.get(move)
+        self.results = {}
+        if res is None:
+            logger.info("ponder miss")
+            return None
+        logger.info("ponder hit")
+        # Steps of the copy back to cells of the board
+        step = None if res.step is None else self.board.to_step(self.copy.step_key(res.step))
+        return SearchResult(res.value, step, res.stats)
+
+    def answer(self, move: int, id: int, search, stop=None):
+        # Engine move for id after the opponent played move, search(id, stop=stop) when not pondered
+        res = self.finish(move, stop)
+        return search(id, stop=stop) if res is None else res
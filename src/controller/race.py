@@ -0,0 +1,114 @@
+import sys
+from model.cell import CellType
+from model.player import Player
+
+class RaceAbort(Exception):
+    pass
+
+def progress(size: int, idx: int, id: int):
+    # Distance covered toward the goal corner
+    row, col = divmod(idx, size)
+    return row + col if id == Player.RED else 2*(size-1) - row - col
+
+def separated(board):
+    # The armies passed each other: every red pion is further down the diagonal than every green
+    # pion, with a gap no step or jump can bridge while both sides only move forward
+    n = board.size
+    red = board.pieces[Player.RED]
+    green = board.pieces[Player.GREEN]
+    if not red or not green:
+        return False
+    return min(idx // n + idx % n for idx in red) - max(idx // n + idx % n for idx in green) > 2
+
+class RaceSolver:
+    # Single-player shortest finish once the armies are separated: iterative deepening over the
+    # forward steps of the pions still outside the goal house (the others stay where they are).
+    # Bounds are kept in table for the rest of the game, keyed by (id, own occupancy):
+    # [lower bound, upper bound, first step key of a finish in upper bound moves]
+    def __init__(self, board, max_pieces: int = 3, max_moves: int = 12, max_nodes: int = 20000):
+        self.board = board
+        self.max_pieces = max_pieces
+        self.max_moves = max_moves
+        self.max_nodes = max_nodes
+        self.table = {}
+        self.nodes = 0
+        # (id, pions outside) of races too big for max_nodes, not tried again
+        self.given_up = set()
+
+    def outside(self, id: int):
+        board = self.board
+        return board.count_pion - (board.count_finish_red if id == Player.RED else board.count_finish_green)
+
+    def solve(self, id: int):
+        # (moves to finish, first move) or None when not in a solvable race
+        board = self.board
+        outside = self.outside(id)
+        if outside == 0 or outside > self.max_pieces or (id, outside) in self.given_up or not separated(board):
+            return None
+        opponent = 0
+        for idx in board.pieces[Player.GREEN if id == Player.RED else Player.RED]:
+            opponent |= 1 << idx
+        self.nodes = 0
+        try:
+            # The first limit that works is the shortest finish
+            for limit in range(outside, self.max_moves + 1):
+                if self.search(id, opponent, limit):
+                    break
+            else:
+                return None
+        except RaceAbort:
+            self.given_up.add((id, outside))
+            return None
+        _, moves, move = self.table[(id, board.occ ^ opponent)]
+        # Stored in an earlier turn, make sure it is still legal
+        if move & 0xffff not in board.reachable(move >> 16, id):
+            return None
+        return moves, move
+
+    def forward_steps(self, id: int):
+        board = self.board
+        n = board.size
+        steps = []
+        for idx in board.pieces[id]:
+            # Pions can't leave the goal house once in
+            if board.flat[idx].owner not in (CellType.NEUTRAL, id):
+                continue
+            p = progress(n, idx, id)
+            for to in board.reachable(idx, id):
+                gain = progress(n, to, id) - p
+                if gain >= 0:
+                    steps.append((gain, idx, to))
+        # Longest steps first
+        steps.sort(reverse=True)
+        return steps
+
+    def search(self, id: int, opponent: int, limit: int):
+        # Can every pion reach the goal house within limit moves
+        board = self.board
+        key = (id, board.occ ^ opponent)
+        entry = self.table.get(key)
+        if entry is None:
+            # Every move brings at most one pion home
+            outside = self.outside(id)
+            entry = self.table[key] = [outside, sys.maxsize if outside else 0, None]
+        if entry[1] <= limit:
+            return True
+        if entry[0] > limit:
+            return False
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise RaceAbort
+        for _, a, b in self.forward_steps(id):
+            move = a << 16 | b
+            board.apply_move(move)
+            try:
+                found = self.search(id, opponent, limit - 1)
+                child = self.table[(id, board.occ ^ opponent)]
+            finally:
+                board.undo_move(move)
+            if found:
+                entry[1] = child[1] + 1
+                entry[2] = move
+                return True
+        entry[0] = limit + 1
+        return False
@@ -0,0 +1,110 @@
+import json, math, os, struct
+from model.player import Player
+
+# Game archive: game records one after the other, a file can be appended to and read as a stream.
+# Record: header, engine configuration (JSON), start state if not the start position, then one
+# entry per move: from index, to index (one byte each), then the optional eval and time (float32)
+#   header: magic, board size, flags, winner (0 none, 1 red, 2 green), first mover, config bytes, moves
+MAGIC = b"HGR1"
+HEADER = struct.Struct("<4sBBBBHI")
+HAS_EVALS = 1
+HAS_TIMES = 2
+HAS_START = 4
+
+RECORD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "records")
+
+def entry_struct(flags: int):
+    return struct.Struct("<BB" + ("f" if flags & HAS_EVALS else "") + ("f" if flags & HAS_TIMES else ""))
+
+class GameRecord:
+    # One game: packed moves (from index << 16 | to index) with the mover's eval and the time
+    # spent per move (None when unknown), config: JSON-able engine configuration,
+    # start: encoded state (Board.encode) when the game did not start at the start position
+    def __init__(self, size: int, config: dict = None, start: bytes = None, first: int = Player.RED):
+        self.size = size
+        self.config = config or {}
+        self.start = start
+        self.first = first
+        self.moves = []
+        self.evals = []
+        self.times = []
+        self.winner = None
+
+    def __len__(self):
+        return len(self.moves)
+
+    def add(self, move: int, value: float = None, seconds: float = None):
+        self.moves.append(move)
+        self.evals.append(value)
+        self.times.append(seconds)
+
+    def replay(self, board):
+        # Yields (id, move) for every move, with board set to the position before it
+        board.set_state(self.start[1:] if self.start is not None else board.geo.owner)
+        id = self.first
+        for move in self.moves:
+            yield id, move
+            board.apply_move(move)
+            id = Player.GREEN if id == Player.RED else Player.RED
+
+    def pack(self):
+        flags = (HAS_EVALS if any(v is not None for v in self.evals) else 0) | \
+                (HAS_TIMES if any(t is not None for t in self.times) else 0) | \
+                (HAS_START if self.start is not None else 0)
+        config = json.dumps(self.config, sort_keys=True).encode()
+        parts = [HEADER.pack(MAGIC, self.size, flags, self.winner or 0, self.first, len(config), len(self.moves)), config]
+        if self.start is not None:
+            parts.append(self.start[1:])
+        entry = entry_struct(flags)
+        for move, value, seconds in zip(self.moves, self.evals, self.times):
+            fields = [move >> 16, move & 0xffff]
+            if flags & HAS_EVALS:
+                fields.append(math.nan if value is None else value)
+            if flags & HAS_TIMES:
+                fields.append(math.nan if seconds is None else seconds)
+            parts.append(entry.pack(*fields))
+        return b"".join(parts)
+
+    @classmethod
+    def read(cls, f):
+        # Next record of a binary file, None at the end
+        header = f.read(HEADER.size)
+        if not header:
+            return None
+        if len(header) < HEADER.size:
+            raise ValueError("truncated game record")
+        magic, size, flags, winner, first, config_len, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("not a game record")
+        record = cls(size, json.loads(f.read(config_len).decode()), first=Player(first))
+        if flags & HAS_START:
+            record.start = bytes([size]) + f.read(size * size)
+        record.winner = Player(winner) if winner else None
+        entry = entry_struct(flags)
+        data = f.read(entry.size * count)
+        if len(data) < entry.size * count:
+            raise ValueError("truncated game record")
+        for fields in entry.iter_unpack(data):
+            value = seconds = None
+            if flags & HAS_EVALS:
+                value = None if math.isnan(fields[2]) else fields[2]
+            if flags & HAS_TIMES:
+                seconds = None if math.isnan(fields[-1]) else fields[-1]
+            record.add(fields[0] << 16 | fields[1], value, seconds)
+        return record
+
+def append_record(path: str, record: GameRecord):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(record.pack())
+
+def read_records(path: str):
+    # Records of an archive one at a time, only the current game is in memory
+    with open(path, "rb") as f:
+        while True:
+            record = GameRecord.read(f)
+            if record is None:
+                return
+            yield record
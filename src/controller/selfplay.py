@@ -0,0 +1,254 @@
+import numpy as np
+from model.cell import CellType, Pion
+from model.player import Player
+from .geometry import get_geometry, DIRECTIONS
+from .evaluation import get_evaluator
+from .halma import Board
+from .record import GameRecord
+
+# Lockstep self-play: many games of one size on NumPy arrays, every running game makes its ply
+# at the same time (so all games have the same side to move). The targets of all pions of all
+# games are found in one pass on bit sets (as in BitBoard): single steps are the 8 shifts of the
+# pion, jump chains grow as a frontier (shift over an occupied midpoint onto an empty allowed
+# cell) until no game finds a new landing. Games end as in the arena: finished, draw (Board.is_draw),
+# no_move or move_cap. Policies pick one move per game:
+#   random: any legal move
+#   greedy: longest step toward the goal corner (mcts.greedy_policy)
+#   eval:   best evaluation after the move (mcts.eval_policy)
+# Ties are broken at random.
+
+RUNNING, FINISHED, DRAW, NO_MOVE, MOVE_CAP = range(5)
+REASONS = {FINISHED: "finished", DRAW: "draw", NO_MOVE: "no_move", MOVE_CAP: "move_cap"}
+POLICIES = ("random", "greedy", "eval")
+
+class LockstepGames:
+    def __init__(self, size: int, games: int, policy: str = "greedy", max_moves: int = 400, seed: int = None,
+                 evaluator="default"):
+        assert policy in POLICIES
+        geo = get_geometry(size)
+        self.size = size
+        self.games = games
+        self.policy = policy
+        self.max_moves = max_moves
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.count_pion = sum(range(1, size//2 + 1))
+        self.owner = np.array(geo.owner, dtype=np.intp)
+        self.diag = np.array(geo.diag, dtype=np.float64)
+        # Cell sets are bit rows packed in uint64 words, rows_per_word whole rows per word:
+        # the cell idx is bit cell_bit[idx] of word cell_word[idx], a size 8 board is one word
+        self.rows_per_word = 64 // size
+        self.words = -(-size // self.rows_per_word)
+        rows, cols = np.divmod(np.arange(size*size), size)
+        self.cell_word = rows // self.rows_per_word
+        self.cell_bit = ((rows % self.rows_per_word) * size + cols).astype(np.uint64)
+        self.cell_mask = np.uint64(1) << self.cell_bit
+        self.column_cell = np.zeros(self.words * 64, dtype=np.intp)
+        self.column_cell[self.cell_word * 64 + self.cell_bit.astype(np.intp)] = np.arange(size*size)
+        # keep_east[k]: cells that stay on the board when moved k columns east, keep_west[k] west
+        def mask(cells):
+            return self.pack(np.array(cells, dtype=bool)[None, :])[0]
+        self.keep_east = {k: mask(cols < size - k) for k in (1, 2)}
+        self.keep_west = {k: mask(cols >= k) for k in (1, 2)}
+        # allowed[owner, id], see Geometry.allowed
+        self.allowed = np.zeros((3, 3, self.words), dtype=np.uint64)
+        for owner in CellType:
+            for id in (Player.RED, Player.GREEN):
+                self.allowed[owner, id] = mask(np.frombuffer(geo.allowed[owner][id], dtype=np.uint8))
+        # Per pion move values for the eval policy
+        if policy == "eval":
+            values = get_evaluator(evaluator).values(size)
+            self.values = {pion: np.array(values[pion]) for pion in (Pion.RED, Pion.GREEN)}
+        # Start position: every house full of its own pions
+        self.states = np.tile(self.owner.astype(np.int8), (games, 1))
+        self.pieces = {id: np.tile(np.flatnonzero(self.owner == id), (games, 1)) for id in (Player.RED, Player.GREEN)}
+        self.finish = {id: np.zeros(games, dtype=np.intp) for id in (Player.RED, Player.GREEN)}
+        self.status = np.zeros(games, dtype=np.int8)
+        self.winner = np.zeros(games, dtype=np.int8)
+        self.moves = np.zeros(games, dtype=np.intp)
+        # Packed moves (from index << 16 | to index) of every game
+        self.history = np.zeros((games, max_moves), dtype=np.uint32)
+        self.id = Player.RED
+
+    def pack(self, cells):
+        # (count, size*size) bools -> (count, words) bit sets
+        res = np.zeros((len(cells), self.words), dtype=np.uint64)
+        for w in range(self.words):
+            on = self.cell_word == w
+            res[:, w] = (cells[:, on] * self.cell_mask[on]).sum(axis=1, dtype=np.uint64)
+        return res
+
+    def shift_cols(self, bits, k: int, dc: int):
+        # Cell sets moved k columns east (dc > 0) or west, cells leaving the board are dropped
+        if dc > 0:
+            return (bits & self.keep_east[k]) << np.uint64(k)
+        if dc < 0:
+            return (bits & self.keep_west[k]) >> np.uint64(k)
+        return bits
+
+    def shift_rows(self, bits, k: int, dr: int):
+        # Cell sets moved k rows south (dr > 0) or north, the rows crossing a word boundary are
+        # carried over. Rows moved off the board may be left in the unused bits, callers mask
+        # the result with board cells
+        if dr == 0:
+            return bits
+        rows = np.uint64(k * self.size)
+        carry = np.uint64((self.rows_per_word - k) * self.size)
+        if dr > 0:
+            res = bits << rows
+            res[..., 1:] |= bits[..., :-1] >> carry
+        else:
+            res = bits >> rows
+            res[..., :-1] |= bits[..., 1:] << carry
+        return res
+
+    def targets(self, id: int, active):
+        # Target bit sets of the pions of id in the active games, row game * count_pion + pion
+        # (self.pieces order)
+        pos = self.pieces[id][active].ravel()
+        # One row per pion of every game
+        games = np.repeat(np.arange(len(active)), self.count_pion)
+        occ = self.pack(self.states[active] != Pion.NONE)
+        allowed = self.allowed[self.owner[pos], id] & ~occ[games]
+        # Jump midpoints per game and direction, the same for the whole move
+        mids = np.stack([self.shift_rows(self.shift_cols(occ, 1, dc), 1, dr) for dr, dc in DIRECTIONS], axis=1)
+        origin = np.zeros((len(pos), self.words), dtype=np.uint64)
+        origin[np.arange(len(pos)), self.cell_word[pos]] = self.cell_mask[pos]
+        steps = np.zeros_like(origin)
+        for dr, dc in DIRECTIONS:
+            steps |= self.shift_rows(self.shift_cols(origin, 1, dc), 1, dr)
+        steps &= allowed
+        # Jump chains, grown for the pions that found a new landing only. free: allowed cells
+        # not reached yet
+        free = allowed.copy()
+        frontier = origin
+        live = np.arange(len(pos))
+        while len(live):
+            cols = {dc: self.shift_cols(frontier, 2, dc) for dc in (-1, 0, 1)}
+            mid = mids[games[live]]
+            landing = np.zeros_like(frontier)
+            for k, (dr, dc) in enumerate(DIRECTIONS):
+                landing |= self.shift_rows(cols[dc], 2, dr) & mid[:, k]
+            landing &= free[live]
+            found = landing.any(axis=1)
+            live, frontier = live[found], landing[found]
+            free[live] &= ~frontier
+        return steps | allowed & ~free
+
+    def cells(self, bits):
+        # (row, idx) of every cell of the bit sets, in row order
+        data = bits.astype("<u8", copy=False).view(np.uint8).ravel()
+        nonzero = np.flatnonzero(data)
+        byte, bit = np.nonzero(np.unpackbits(data[nonzero, None], axis=1, bitorder="little"))
+        row, column = np.divmod(nonzero[byte] * 8 + bit, self.words * 64)
+        return row, self.column_cell[column]
+
+    def legal(self, id: int, active):
+        # (targets, movable, draw) of the active games, movable[game, pion], draw as in
+        # Board.gen_moves: the pions stuck in their own house fill what the opponent has not reached of it
+        targets = self.targets(id, active)
+        other = Player.GREEN if id == Player.RED else Player.RED
+        movable = targets.any(axis=1).reshape(len(active), self.count_pion)
+        stuck = (~movable & (self.owner[self.pieces[id][active]] == id)).sum(axis=1)
+        return targets, movable, stuck == self.count_pion - self.finish[other][active]
+
+    def choose(self, id: int, game, src, to):
+        # Index of the chosen move of every game in the move list (grouped by game, every game
+        # has one), the noise only breaks ties
+        noise = self.rng.random(len(game))
+        if self.policy == "random":
+            score = noise
+        elif self.policy == "greedy":
+            sign = 1 if id == Player.RED else -1
+            score = sign * (self.diag[to] - self.diag[src]) + noise * 0.5
+        else:
+            values = self.values[id]
+            sign = -1 if id == Player.RED else 1
+            score = sign * (values[to] - values[src]) + noise * 1e-6
+        starts = np.flatnonzero(np.r_[True, game[1:] != game[:-1]])
+        best = np.maximum.reduceat(score, starts)
+        hit = np.flatnonzero(score == np.repeat(best, np.diff(np.r_[starts, len(game)])))
+        return hit[np.r_[True, game[hit][1:] != game[hit][:-1]]]
+
+    def step(self):
+        # One ply of every running game, returns the number of games still running
+        active = np.flatnonzero(self.status == RUNNING)
+        if not len(active):
+            return 0
+        id = self.id
+        targets, movable, draw = self.legal(id, active)
+        none = ~movable.any(axis=1)
+        self.status[active[draw]] = DRAW
+        self.status[active[~draw & none]] = NO_MOVE
+        # Legal moves of the games that play
+        row, to = self.cells(targets)
+        game, pion = np.divmod(row, self.count_pion)
+        play = ~draw[game]
+        game, pion, to = active[game[play]], pion[play], to[play]
+        src = self.pieces[id][game, pion]
+        best = self.choose(id, game, src, to)
+        games, pion, src, to = game[best], pion[best], src[best], to[best]
+        self.states[games, src] = Pion.NONE
+        self.states[games, to] = id
+        self.pieces[id][games, pion] = to
+        goal = CellType.GREEN_HOUSE if id == Player.RED else CellType.RED_HOUSE
+        self.finish[id][games] += (self.owner[src] != goal) & (self.owner[to] == goal)
+        self.history[games, self.moves[games]] = src << 16 | to
+        self.moves[games] += 1
+        won = games[self.finish[id][games] == self.count_pion]
+        self.status[won] = FINISHED
+        self.winner[won] = id
+        self.status[games[(self.moves[games] >= self.max_moves) & (self.status[games] == RUNNING)]] = MOVE_CAP
+        self.id = Player.GREEN if id == Player.RED else Player.RED
+        return int((self.status == RUNNING).sum())
+
+    def play(self):
+        while self.step():
+            pass
+        return self.results()
+
+    def results(self):
+        # One arena style dict per game
+        return [{
+            "size": self.size, "game": i, "policy": self.policy,
+            "winner": Player(self.winner[i]).name.lower() if self.winner[i] else None,
+            "reason": REASONS.get(int(self.status[i]), "running"), "moves": int(self.moves[i]),
+        } for i in range(self.games)]
+
+    def records(self):
+        # GameRecord of every game, for a game archive
+        for i in range(self.games):
+            record = GameRecord(self.size, {"policy": self.policy, "seed": self.seed, "game": i})
+            for move in self.history[i, :self.moves[i]]:
+                record.add(int(move))
+            record.winner = Player(self.winner[i]) if self.winner[i] else None
+            yield record
+
+    def board(self, game: int, **kwargs):
+        # Board of one game's current position
+        kwargs.setdefault("tt_size_mb", 0)
+        kwargs.setdefault("book", None)
+        kwargs.setdefault("race", False)
+        return Board.decode(bytes([self.size]) + self.states[game].tobytes(), **kwargs)
+
+    def cross_check(self, sample: int = 8):
+        # Compare the moves and draw detection of the first sample running games with
+        # Board.gen_all_pos_steps, returns the games that differ
+        active = np.flatnonzero(self.status == RUNNING)[:sample]
+        if not len(active):
+            return []
+        id = self.id
+        targets, movable, draw = self.legal(id, active)
+        row, to = self.cells(targets)
+        game, pion = np.divmod(row, self.count_pion)
+        src = self.pieces[id][active[game], pion]
+        bad = []
+        for k, i in enumerate(active):
+            board = self.board(i, evaluator=None)
+            steps = board.gen_all_pos_steps(id)
+            expected = None if steps is None else {board.step_key(step) for step in steps}
+            found = None if draw[k] else {int(a) << 16 | int(b) for a, b in zip(src[game == k], to[game == k])}
+            if found != expected or (board.count_finish_red, board.count_finish_green) != \
+                    (self.finish[Player.RED][i], self.finish[Player.GREEN][i]):
+                bad.append(int(i))
+        return bad
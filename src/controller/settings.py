@@ -0,0 +1,22 @@
+import json, os
+from functools import lru_cache
+
+# Search settings loaded at startup, resource/config/search.json is written by python -m tuning.sweep
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "config", "search.json")
+
+# minimax_with_local annealing knobs when the file has none
+LOCAL_DEFAULTS = {"anneal_threshold": 0.9, "sample_min": 30, "sample_div": 1.4}
+
+@lru_cache(maxsize=None)
+def local_settings(path: str = DEFAULT_PATH):
+    # Shared dict, do not change it
+    settings = dict(LOCAL_DEFAULTS)
+    if os.path.exists(path):
+        with open(path) as f:
+            settings.update(json.load(f).get("local", {}))
+    return settings
+
+def save_local_settings(settings: dict, path: str = DEFAULT_PATH):
+    with open(path, "w") as f:
+        json.dump({"local": settings}, f, indent=2)
+    local_settings.cache_clear()
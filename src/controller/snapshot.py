@@ -0,0 +1,116 @@
+import mmap, os, struct
+
+# Board snapshot: a fixed header then one pion byte per cell (Board.encode order). The counters
+# of the header let Board.load_snapshot skip recomputing them
+#   header: board size, side to move (0 unknown), flags, red pions home, green pions home, cost, zobrist hash
+SNAPSHOT = struct.Struct("<BBBBBxhQ")
+# The counters are set, else (written from a Board.encode state) they are recomputed on load
+HAS_COUNTERS = 1
+
+# Store: a header then count slots, each holds the snapshot of a board up to max_size. It lives in
+# shared memory (multiprocessing.shared_memory, Python 3.8+) or in a memory-mapped file, so worker
+# processes read positions in place and tasks only carry slot numbers
+#   header: magic, max board size, slot count
+STORE = struct.Struct("<4sHxxI")
+MAGIC = b"HSS1"
+# Slots start 8-byte aligned
+HEADER_SIZE = 16
+MAX_SIZE = 16
+
+def slot_size(max_size: int):
+    return -(-(SNAPSHOT.size + max_size * max_size) // 8) * 8
+
+class SnapshotStore:
+    # SnapshotStore(count): new store of count slots in shared memory, SnapshotStore(count, path=...):
+    # in a new file. SnapshotStore(name=...) / SnapshotStore(path=...): attach to an existing store.
+    # Shared memory is attached from processes of the same multiprocessing family (pool workers),
+    # other processes use a file
+    def __init__(self, count: int = None, max_size: int = MAX_SIZE, path: str = None, name: str = None):
+        create = count is not None
+        length = HEADER_SIZE + count * slot_size(max_size) if create else 0
+        self.path = path
+        self.shm = self.file = self.map = None
+        if path is not None:
+            if create:
+                with open(path, "wb") as f:
+                    f.truncate(length)
+            self.file = open(path, "r+b")
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            buf = self.map
+        else:
+            from multiprocessing import shared_memory
+            self.shm = shared_memory.SharedMemory(name=name, create=create, size=length)
+            buf = self.shm.buf
+        self.owner = create
+        self.buf = memoryview(buf)
+        if create:
+            STORE.pack_into(self.buf, 0, MAGIC, max_size, count)
+        magic, self.max_size, self.count = STORE.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("not a snapshot store")
+        self.slot = slot_size(self.max_size)
+
+    @property
+    def name(self):
+        return None if self.shm is None else self.shm.name
+
+    @property
+    def handle(self):
+        # Keyword arguments attaching another process to this store
+        return {"path": self.path} if self.path is not None else {"name": self.name}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int):
+        # Snapshot slot i, a view on the store
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start = HEADER_SIZE + i * self.slot
+        return self.buf[start:start + self.slot]
+
+    def size_of(self, i: int):
+        # Board size of the snapshot in slot i
+        return self.buf[HEADER_SIZE + i * self.slot]
+
+    def write(self, i: int, board, id: int = None):
+        if board.size > self.max_size:
+            raise ValueError("size %d board in a store of size %d slots" % (board.size, self.max_size))
+        board.write_snapshot(self[i], id)
+
+    def write_state(self, i: int, state, id: int = None):
+        # Board.encode state into slot i, copied as is, the counters are computed by the reader
+        if state[0] > self.max_size:
+            raise ValueError("size %d board in a store of size %d slots" % (state[0], self.max_size))
+        slot = self[i]
+        SNAPSHOT.pack_into(slot, 0, state[0], id or 0, 0, 0, 0, 0, 0)
+        slot[SNAPSHOT.size:SNAPSHOT.size + len(state) - 1] = state[1:]
+
+    def load(self, i: int, board):
+        # Slot i into board (same size), returns the side to move
+        return board.load_snapshot(self[i])
+
+    def close(self):
+        self.buf.release()
+        if self.shm is not None:
+            self.shm.close()
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+
+    def unlink(self):
+        # Free the shared memory or remove the file, once every process has closed it
+        if self.shm is not None:
+            self.shm.unlink()
+        elif self.path is not None:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Shared memory created here goes with the store, files stay
+        self.close()
+        if self.owner and self.shm is not None:
+            self.shm.unlink()
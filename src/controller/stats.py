@@ -0,0 +1,97 @@
+import time
+from collections import namedtuple
+
+# What every engine returns, indexable like the old (value, step) tuple
+SearchResult = namedtuple("SearchResult", ["value", "step", "stats"])
+
+class DepthStats:
+    # Counters of one iterative deepening iteration
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.time = 0.0
+        self.value = None
+        self.pv = []
+        self.completed = False
+
+    @property
+    def nps(self):
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+    @property
+    def cutoff_rate(self):
+        # Share of interior nodes that ended with a beta cutoff
+        interior = self.nodes - self.leaves
+        return self.cutoffs / interior if interior > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            "depth": self.depth, "nodes": self.nodes, "leaves": self.leaves,
+            "cutoffs": self.cutoffs, "cutoff_rate": self.cutoff_rate,
+            "time": self.time, "nps": self.nps, "value": self.value,
+            "pv": self.pv, "completed": self.completed,
+        }
+
+class SearchStats:
+    # Per-depth statistics of one search, filled from the board counters
+    # (child, leaves, cutoffs) at every iteration boundary
+    def __init__(self, engine: str, id: int):
+        self.engine = engine
+        self.id = int(id)
+        self.depths = []
+        self.start_time = time.time()
+        self.time = 0.0
+        self._mark = None
+
+    def begin(self, board, depth: int):
+        self.depths.append(DepthStats(depth))
+        self._mark = (board.child, board.leaves, board.cutoffs, time.time())
+
+    def end(self, board, value, pv, completed: bool):
+        d = self.depths[-1]
+        child, leaves, cutoffs, st = self._mark
+        d.nodes = board.child - child
+        d.leaves = board.leaves - leaves
+        d.cutoffs = board.cutoffs - cutoffs
+        d.time = time.time() - st
+        d.value = value
+        d.pv = pv
+        d.completed = completed
+        self.time = time.time() - self.start_time
+
+    @property
+    def nodes(self):
+        return sum(d.nodes for d in self.depths)
+
+    @property
+    def nps(self):
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+    @property
+    def depth(self):
+        # Deepest completed iteration
+        completed = [d.depth for d in self.depths if d.completed]
+        return completed[-1] if completed else 0
+
+    @property
+    def pv(self):
+        completed = [d for d in self.depths if d.completed]
+        return completed[-1].pv if completed else []
+
+    def ebf(self):
+        # Effective branching factor between consecutive completed iterations
+        res = []
+        for prev, cur in zip(self.depths, self.depths[1:]):
+            if prev.completed and cur.completed and prev.nodes > 0:
+                res.append(cur.nodes / prev.nodes)
+        return res
+
+    def to_dict(self):
+        return {
+            "engine": self.engine, "id": self.id, "depth": self.depth,
+            "nodes": self.nodes, "time": self.time, "nps": self.nps,
+            "ebf": self.ebf(), "pv": self.pv,
+            "depths": [d.to_dict() for d in self.depths],
+        }
@@ -0,0 +1,93 @@
+import time
+from exception import SearchTimeout
+
+class StopToken:
+    # Cooperative cancellation: cancel() from any thread, the search stops at its next
+    # time check and returns its best move so far
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimeManager:
+    # Per-move time allotment and hard deadline for iterative deepening
+    # game_time: whole-game clock per player in seconds, None for per-move budget only. An outside
+    # clock (arena, protocol go wtime/btime) is given with set_clock before every search
+    # partial: fraction of the predicted next iteration that must fit before starting it,
+    # below 1 because a partial iteration can still improve the result
+    def __init__(self, game_time: float = None, min_moves_to_go: int = 10, safety: float = 0.05,
+                 partial: float = 0.5, check_every: int = 64):
+        self.remaining = {}
+        self.increment = {}
+        self.partial = partial
+        self.game_time = game_time
+        self.min_moves_to_go = min_moves_to_go
+        self.safety = safety
+        self.check_every = check_every
+        self.counter = check_every
+        self.id = None
+        self.start_time = 0
+        self.budget = None
+        self.deadline = float("inf")
+        self.token = None
+
+    def start(self, id: int, max_time: float, moves_to_go: int, stop: StopToken = None):
+        self.id = id
+        self.token = stop
+        self.start_time = time.time()
+        self.counter = self.check_every
+        # Budget: max_time per move, capped by an even share of the remaining clock
+        budget = None if max_time == -1 else max_time
+        if self.game_time is not None or id in self.remaining:
+            remaining = max(self.remaining.setdefault(id, self.game_time), 0)
+            # Never more than half the clock, the increment comes back after the move
+            share = min(remaining / max(moves_to_go, self.min_moves_to_go) + self.increment.get(id, 0), remaining / 2)
+            budget = share if budget is None else min(budget, share)
+        self.budget = budget
+        self.deadline = float("inf") if budget is None else self.start_time + budget * (1 - self.safety)
+
+    def set_clock(self, id: int, remaining: float = None, increment: float = 0):
+        # Time left on id's clock and its per-move increment, in seconds, None for no clock
+        if remaining is None:
+            self.remaining.pop(id, None)
+            self.increment.pop(id, None)
+        else:
+            self.remaining[id] = remaining
+            self.increment[id] = increment
+
+    def finish(self):
+        elapsed = time.time() - self.start_time
+        if self.id in self.remaining:
+            self.remaining[self.id] += self.increment.get(self.id, 0) - elapsed
+        return elapsed
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    @property
+    def cancelled(self):
+        return self.token is not None and self.token.cancelled
+
+    def stop(self):
+        # Make the running search abort at its next check
+        self.deadline = 0
+        self.counter = 0
+
+    def check(self):
+        # Called on every node, looks at the clock every check_every nodes
+        self.counter -= 1
+        if self.counter <= 0:
+            self.counter = self.check_every
+            if time.time() >= self.deadline or self.token is not None and self.token.cancelled:
+                raise SearchTimeout()
+
+    def can_deepen(self, last: float, before_last: float):
+        # Predict the next iteration from the effective branching factor of the last two
+        if self.cancelled:
+            return False
+        if self.budget is None:
+            return True
+        ebf = last / before_last if before_last > 0 else 2.0
+        predicted = last * max(ebf, 1.0)
+        return time.time() + predicted * self.partial < self.deadline
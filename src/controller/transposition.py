@@ -0,0 +1,44 @@
+# Bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Rough size of one entry (list slot + tuple + ints), used to turn MB into slots
+ENTRY_BYTES = 128
+
+class TranspositionTable:
+    # Fixed-size hash table, one entry per slot:
+    # (key, depth, flag, value, move, generation)
+    # Replacement: empty slot, same position, entry from an older search, or deeper/equal depth
+    def __init__(self, size_mb: float = 16):
+        slots = max(1, int(size_mb * (1 << 20)) // ENTRY_BYTES)
+        self.slots = 1 << (slots.bit_length() - 1)
+        self.mask = self.slots - 1
+        self.entries = [None] * self.slots
+        self.generation = 0
+
+    def new_search(self):
+        # Entries from previous searches become replaceable but stay usable
+        self.generation = (self.generation + 1) & 0xff
+
+    def clear(self):
+        self.entries = [None] * self.slots
+        self.generation = 0
+
+    def probe(self, key: int):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move):
+        idx = key & self.mask
+        old = self.entries[idx]
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            # Keep the known best move if the new entry has none
+            if move is None and old is not None and old[0] == key:
+                move = old[4]
+            self.entries[idx] = (key, depth, flag, value, move, self.generation)
+
+    def usage(self):
+        return sum(entry is not None for entry in self.entries) / self.slots
@@ -0,0 +1,25 @@
+import random
+from functools import lru_cache
+from model.cell import Pion
+
+class Zobrist:
+    # Random 64-bit keys per (pion, cell), fixed seed so hashes are stable between runs
+    def __init__(self, size: int, seed: int = 0x4a17a):
+        rng = random.Random(seed * 1000 + size)
+        self.keys = {
+            Pion.RED: [rng.getrandbits(64) for _ in range(size*size)],
+            Pion.GREEN: [rng.getrandbits(64) for _ in range(size*size)],
+        }
+        # Xor-ed in when green is on the move
+        self.side = rng.getrandbits(64)
+
+    def hash_cells(self, cells):
+        h = 0
+        for idx, cell in enumerate(cells):
+            if cell.pion != Pion.NONE:
+                h ^= self.keys[cell.pion][idx]
+        return h
+
+@lru_cache(maxsize=None)
+def get_zobrist(size: int):
+    return Zobrist(size)
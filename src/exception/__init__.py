@@ -0,0 +1,7 @@
+class SearchTimeout(Exception):
+    # Raised inside the search when the deadline is reached or the search is cancelled
+    pass
+
+class EngineError(Exception):
+    # An engine process exited or answered outside the protocol
+    pass
@@ -1,3 +1,4 @@
+import logging
 import sys
 from PyQt5.QtWidgets import QApplication
 
@@ -5,6 +6,8 @@ from view import MainWindow
 
 
 if __name__ == "__main__":
+    # Search progress is reported through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     mainWindow = MainWindow()
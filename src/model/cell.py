@@ -12,6 +12,8 @@ class Pion(IntEnum):
     GREEN = 2
 
 class Cell:
+    __slots__ = ("owner", "pion", "row", "col")
+
     def __init__(self, owner: int, pion: int, row: int, col: int):
         self.owner = owner
         self.pion = pion
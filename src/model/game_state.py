@@ -1,16 +1,43 @@
-from controller.halma import Board
 from .cell import Pion
 from .player import Player
 
 
 class GameState:
-    def __init__(self, board: Board, hum_player: Player, act_player: Player = Player.RED):
+    # Adjudication: max_moves (None for no cap) and repetition_limit (the game ends when a position
+    # comes back that many times, 0 to never stop) end games nobody is winning
+    def __init__(self, board, hum_player: Player, act_player: Player = Player.RED,
+                 max_moves: int = None, repetition_limit: int = 3):
         self.board = board
         self.hum_player = hum_player
         self.act_player = act_player
+        self.max_moves = max_moves
+        self.repetition_limit = repetition_limit
+        self.moves = 0
+        # Times each position (hash with the side to move) occurred, the board search reads it
+        self.history = {}
+        board.repetitions = self.history
+        self.add_position()
+
+    def position_key(self):
+        return self.board.tt_key(self.act_player, True)
+
+    def add_position(self):
+        key = self.position_key()
+        self.history[key] = self.history.get(key, 0) + 1
 
     def next_turn(self):
+        # Called after every move
         self.act_player = Player.RED if self.act_player == Player.GREEN else Player.GREEN
+        self.moves += 1
+        self.add_position()
+
+    def adjudicate(self):
+        # "move_cap" or "repetition" when the game must stop without a winner, else None
+        if self.max_moves is not None and self.moves >= self.max_moves:
+            return "move_cap"
+        if self.repetition_limit and self.history[self.position_key()] >= self.repetition_limit:
+            return "repetition"
+        return None
 
     def is_red_player_win(self):
         if self.board.count_finish_red == self.board.count_pion:
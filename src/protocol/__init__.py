@@ -0,0 +1,2 @@
+from .engine import Engine, run
+# The asyncio client (protocol.client) is not imported here, engine processes start without asyncio
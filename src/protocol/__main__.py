@@ -0,0 +1,15 @@
+import argparse
+from arena.engine import EngineConfig
+from .engine import run
+
+# Engine process speaking the text protocol (see engine.py) on stdin/stdout, from src:
+#   python -m protocol --engine minimax:max_time=0.5
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m protocol", description="Halma engine over stdin/stdout")
+    parser.add_argument("--engine", default="minimax", help="engine spec, e.g. local:max_time=1,sample_min=20")
+    args = parser.parse_args(argv)
+    run(EngineConfig.parse(args.engine))
+
+if __name__ == "__main__":
+    main()
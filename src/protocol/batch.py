@@ -0,0 +1,28 @@
+import argparse, asyncio, json, os
+from benchmark.corpus import gen_positions
+from .client import analyse
+
+def main(argv=None):
+    # Batch analysis of the benchmark corpus, from src:
+    #   python -m protocol.batch --engines 4 --engine minimax --size 10 --positions 20 --movetime 200
+    parser = argparse.ArgumentParser(prog="python -m protocol.batch", description="Analyse positions on engine processes")
+    parser.add_argument("--engine", default="minimax", help="engine spec, e.g. mcts:iterations=500")
+    parser.add_argument("--engines", type=int, default=os.cpu_count(), help="engine processes")
+    parser.add_argument("--size", type=int, default=8, choices=(8, 10, 16))
+    parser.add_argument("--positions", type=int, default=10)
+    parser.add_argument("--movetime", type=int, default=None, help="ms per position")
+    parser.add_argument("--depth", type=int, default=None)
+    args = parser.parse_args(argv)
+    positions = gen_positions(args.size, args.positions)
+    # asyncio.run is Python 3.7+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        results = loop.run_until_complete(analyse(positions, [args.engine] * args.engines, args.movetime, args.depth))
+    finally:
+        loop.close()
+    for result in results:
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import asyncio, os, sys
+from collections import namedtuple
+from model.player import Player
+from exception import EngineError
+from .notation import side_text
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Result of a go: best move text (None when there is no move) and the info lines as dicts
+SearchReply = namedtuple("SearchReply", ["move", "infos"])
+
+def parse_info(line: str):
+    # "info depth 3 score 1.5 nodes 100 ... pv a1b2 c3d4" -> {"depth": 3, "score": 1.5, ..., "pv": [...]}
+    words = line.split()[1:]
+    info = {}
+    i = 0
+    while i < len(words):
+        key = words[i]
+        if key in ("pv", "string"):
+            rest = words[i+1:]
+            info[key] = rest if key == "pv" else " ".join(rest)
+            break
+        value = words[i+1] if i + 1 < len(words) else ""
+        try:
+            info[key] = int(value)
+        except ValueError:
+            try:
+                info[key] = float(value)
+            except ValueError:
+                info[key] = value
+        i += 2
+    return info
+
+class EngineProcess:
+    # One engine subprocess (python -m protocol), driven with asyncio
+    # spec: EngineConfig spec of the engine, e.g. "mcts:iterations=500"
+    def __init__(self, spec: str = None, name: str = None):
+        self.spec = spec
+        self.name = name or spec or "minimax"
+        self.process = None
+        self.options = {}
+
+    async def start(self):
+        args = [sys.executable, "-m", "protocol"]
+        if self.spec:
+            args += ["--engine", self.spec]
+        self.process = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, cwd=SRC_DIR)
+        await self.send("uci")
+        while True:
+            line = await self.read()
+            if line == "uciok":
+                break
+            words = line.split()
+            if words[:2] == ["option", "name"]:
+                self.options[words[2]] = words[-1]
+
+    async def restart(self):
+        await self.kill()
+        await self.start()
+
+    async def send(self, line: str):
+        if self.process is None or self.process.returncode is not None:
+            raise EngineError("%s: not running" % self.name)
+        try:
+            self.process.stdin.write((line + "\n").encode())
+            await self.process.stdin.drain()
+        except ConnectionError as e:
+            raise EngineError("%s: %s" % (self.name, e))
+
+    async def read(self):
+        line = await self.process.stdout.readline()
+        if not line:
+            raise EngineError("%s: engine exited" % self.name)
+        return line.decode().strip()
+
+    async def is_ready(self):
+        await self.send("isready")
+        while await self.read() != "readyok":
+            pass
+
+    async def set_option(self, key: str, value):
+        await self.send("setoption name %s value %s" % (key, value))
+
+    async def new_game(self):
+        await self.send("ucinewgame")
+
+    async def position(self, size: int = None, state: bytes = None, id: int = Player.RED, moves=()):
+        # Start position of size, or an encoded state with the side to move, then moves
+        if state is None:
+            line = "position startpos %d" % size
+        else:
+            line = "position state %s %s" % (state.hex(), side_text(id))
+        if moves:
+            line += " moves " + " ".join(moves)
+        await self.send(line)
+
+    async def go(self, movetime: int = None, depth: int = None, infinite: bool = False, on_info=None, clocks: dict = None):
+        # Search and wait for bestmove, on_info is called with every info dict.
+        # clocks: {"wtime": ms, "btime": ms, "winc": ms, "binc": ms}, any subset
+        line = "go"
+        for key, value in sorted((clocks or {}).items()):
+            line += " %s %d" % (key, value)
+        if movetime is not None:
+            line += " movetime %d" % movetime
+        if depth is not None:
+            line += " depth %d" % depth
+        if infinite:
+            line += " infinite"
+        await self.send(line)
+        infos = []
+        while True:
+            line = await self.read()
+            if line.startswith("info"):
+                info = parse_info(line)
+                if "error" in info.get("string", "").split()[:1]:
+                    raise EngineError("%s: %s" % (self.name, info["string"]))
+                infos.append(info)
+                if on_info is not None:
+                    on_info(info)
+            elif line.startswith("bestmove"):
+                move = line.split()[1]
+                return SearchReply(None if move == "none" else move, infos)
+
+    async def stop(self):
+        # The pending go returns with the best move so far
+        await self.send("stop")
+
+    async def quit(self, timeout: float = 5):
+        if self.process is None:
+            return
+        try:
+            await self.send("quit")
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except (EngineError, asyncio.TimeoutError):
+            await self.kill()
+        self.process = None
+
+    async def kill(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+        self.process = None
+
+async def analyse(positions, specs, movetime: int = None, depth: int = None, retries: int = 1):
+    # Analyse (state, side to move) positions on one engine process per spec, all at once.
+    # A crashed engine is restarted and the position tried again up to retries times.
+    # Returns one dict per position, in order
+    engines = [EngineProcess(spec) for spec in specs]
+    queue = asyncio.Queue()
+    for i, position in enumerate(positions):
+        queue.put_nowait((i, position, 0))
+    results = [None] * len(positions)
+
+    async def work(engine):
+        while not queue.empty():
+            i, (state, id), tries = queue.get_nowait()
+            try:
+                await engine.position(state=state, id=id)
+                reply = await engine.go(movetime=movetime, depth=depth)
+            except EngineError as e:
+                await engine.restart()
+                if tries < retries:
+                    queue.put_nowait((i, (state, id), tries + 1))
+                else:
+                    results[i] = {"position": i, "engine": engine.name, "error": str(e)}
+                continue
+            last = reply.infos[-1] if reply.infos else {}
+            results[i] = {
+                "position": i, "engine": engine.name, "move": reply.move,
+                "score": last.get("score"), "depth": last.get("depth", 0),
+                "nodes": sum(info.get("nodes", 0) for info in reply.infos), "pv": last.get("pv", []),
+            }
+
+    try:
+        await asyncio.gather(*(engine.start() for engine in engines))
+        await asyncio.gather(*(work(engine) for engine in engines))
+    finally:
+        await asyncio.gather(*(engine.quit() for engine in engines))
+    return results
@@ -0,0 +1,187 @@
+import sys, threading
+from model.player import Player
+from controller.time_manager import StopToken
+from arena.engine import EngineConfig
+from .notation import move_text, parse_move, parse_side
+
+# Text protocol in the style of UCI, one command per line on stdin, answers on stdout:
+#   uci                                  -> id name ..., option name <key> type <type> default <value>, uciok
+#   isready                              -> readyok
+#   setoption name <key> value <value>   EngineConfig option (engine, max_time, depth, evaluator, book, ...)
+#   ucinewgame                           fresh board and transposition table at the next position
+#   position startpos <size> [moves <move> ...]
+#   position state <hex> <red|green> [moves <move> ...]
+#                                        hex of Board.encode() and the side to move
+#   go [movetime <ms>] [depth <n>] [infinite] [wtime <ms>] [btime <ms>] [winc <ms>] [binc <ms>]
+#                                        search for the side to move in the background, w is red
+#                                        (the first mover) and b green: the clocks left and their
+#                                        increments, the time for the move is shared out of the clock:
+#                                        info depth <n> score <value> nodes <n> nps <n> time <ms> pv <move> ...
+#                                        per finished iteration, then bestmove <move|none>
+#   stop                                 end the search now, bestmove is its best move so far
+#   quit
+# A command other than isready/stop/quit given during a search stops it first.
+# Errors are reported as "info string error ..." and the command is ignored
+
+class Engine:
+    def __init__(self, config: EngineConfig = None, out=sys.stdout):
+        self.config = config or EngineConfig()
+        self.out = out
+        self.lock = threading.Lock()
+        self.board = None
+        # Side to move, None without a position
+        self.id = None
+        self.thread = None
+        self.token = None
+
+    def send(self, line: str):
+        # Called from the search thread too
+        with self.lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def handle(self, line: str):
+        # Run one command, False on quit
+        words = line.split()
+        if not words:
+            return True
+        cmd, args = words[0], words[1:]
+        try:
+            if cmd == "uci":
+                self.send("id name halma " + self.config.engine)
+                for key, value in sorted(self.config.to_dict().items()):
+                    if key == "name":
+                        continue
+                    kind = "check" if isinstance(value, bool) else "string"
+                    self.send("option name %s type %s default %s" % (key, kind, value))
+                self.send("uciok")
+            elif cmd == "isready":
+                self.send("readyok")
+            elif cmd == "setoption":
+                self.stop()
+                self.set_option(args)
+            elif cmd == "ucinewgame":
+                self.stop()
+                self.board = None
+            elif cmd == "position":
+                self.stop()
+                self.set_position(args)
+            elif cmd == "go":
+                self.stop()
+                self.go(args)
+            elif cmd == "stop":
+                self.stop()
+            elif cmd == "quit":
+                self.stop()
+                return False
+            else:
+                self.send("info string error unknown command " + cmd)
+        except (ValueError, KeyError, IndexError, AssertionError) as e:
+            self.send("info string error %s: %s" % (cmd, e))
+        return True
+
+    def set_option(self, args: list):
+        # setoption name <key> value <value>
+        if len(args) != 4 or args[0] != "name" or args[2] != "value":
+            raise ValueError("expected name <key> value <value>")
+        self.config.set(args[1], args[3])
+        # Board settings may have changed
+        self.board = None
+
+    def set_position(self, args: list):
+        if args[0] == "startpos":
+            size, state, id, rest = int(args[1]), None, Player.RED, args[2:]
+        elif args[0] == "state":
+            state = bytes.fromhex(args[1])
+            size, id, rest = state[0], parse_side(args[2]), args[3:]
+        else:
+            raise ValueError("expected startpos or state")
+        if size not in (8, 10, 16) or state is not None and len(state) != size*size + 1:
+            raise ValueError("bad size %d" % size)
+        if rest and rest[0] != "moves":
+            raise ValueError("expected moves")
+        # Same board (and transposition table) for the whole game
+        if self.board is None or self.board.size != size:
+            self.board = self.config.new_board(size)
+            self.board.stats_callback = self.info
+        board = self.board
+        # No position until this one is fully set up
+        self.id = None
+        # Start position: every house full of its own pions
+        board.set_state(state[1:] if state is not None else board.geo.owner)
+        for text in rest[1:]:
+            move = parse_move(size, text)
+            if board.flat[move >> 16].pion != id or move & 0xffff not in board.reachable(move >> 16, id):
+                raise ValueError("illegal move " + text)
+            board.apply_move(move)
+            id = Player.GREEN if id == Player.RED else Player.RED
+        self.id = id
+
+    def go(self, args: list):
+        if self.board is None or self.id is None:
+            raise ValueError("no position")
+        config = self.config
+        movetime = depth = None
+        infinite = False
+        clocks = {}
+        i = 0
+        while i < len(args):
+            if args[i] == "movetime":
+                movetime = int(args[i+1]); i += 2
+            elif args[i] in ("wtime", "btime", "winc", "binc"):
+                clocks[args[i]] = int(args[i+1]) / 1000; i += 2
+            elif args[i] == "depth":
+                depth = int(args[i+1]); i += 2
+            elif args[i] == "infinite":
+                infinite = True; i += 1
+            else:
+                raise ValueError("unknown go argument " + args[i])
+        board = self.board
+        for id, left, inc in ((Player.RED, "wtime", "winc"), (Player.GREEN, "btime", "binc")):
+            board.time_manager.set_clock(id, clocks.get(left), clocks.get(inc, 0))
+        # infinite: no deadline, the search runs until stop
+        if infinite:
+            board.max_time = float("inf")
+        elif movetime is not None:
+            board.max_time = movetime / 1000
+        else:
+            board.max_time = -1 if depth is not None or self.id in board.time_manager.remaining else config.max_time
+        board.max_depth = depth if depth is not None else config.depth
+        self.token = StopToken()
+        self.thread = threading.Thread(target=self.search, args=(board, self.id, self.token), daemon=True)
+        self.thread.start()
+
+    def search(self, board, id: int, token: StopToken):
+        try:
+            res = self.config.search(board, id, token)
+        except Exception as e:
+            self.send("info string error search: %s" % e)
+            self.send("bestmove none")
+            return
+        if res.stats.engine in ("book", "race"):
+            self.send("info string %s move" % res.stats.engine)
+        self.send("bestmove " + ("none" if res.step is None else move_text(board.size, board.step_key(res.step))))
+
+    def info(self, stats):
+        # Board.stats_callback, once per iteration
+        d = stats.depths[-1]
+        if not d.completed:
+            return
+        pv = " ".join(move_text(self.board.size, (r1*self.board.size + c1) << 16 | (r2*self.board.size + c2))
+                      for r1, c1, r2, c2 in d.pv)
+        self.send("info depth %d score %s nodes %d nps %d time %d pv %s"
+                  % (d.depth, d.value, d.nodes, d.nps, d.time * 1000, pv))
+
+    def stop(self):
+        # Cancel the running search and wait for its bestmove
+        if self.thread is not None:
+            self.token.cancel()
+            self.thread.join()
+            self.thread = None
+
+def run(config: EngineConfig = None, inp=sys.stdin, out=sys.stdout):
+    engine = Engine(config, out)
+    for line in inp:
+        if not engine.handle(line):
+            break
+    engine.stop()
@@ -0,0 +1,33 @@
+import re
+from model.player import Player
+
+# Squares are a column letter and a 1-based row: "a1" is the top-left cell (row 0, col 0).
+# A move is its two squares, "b2d4"; positions are the hex of Board.encode()
+COLUMNS = "abcdefghijklmnop"
+MOVE_RE = re.compile(r"([a-p])(\d+)([a-p])(\d+)$")
+
+def square_text(size: int, idx: int):
+    row, col = divmod(idx, size)
+    return COLUMNS[col] + str(row + 1)
+
+def move_text(size: int, move: int):
+    return square_text(size, move >> 16) + square_text(size, move & 0xffff)
+
+def parse_move(size: int, text: str):
+    # Packed move (from index << 16 | to index) of a move text
+    match = MOVE_RE.match(text)
+    if match is None:
+        raise ValueError("bad move: %s" % text)
+    c1, r1, c2, r2 = COLUMNS.index(match.group(1)), int(match.group(2)) - 1, COLUMNS.index(match.group(3)), int(match.group(4)) - 1
+    if not (0 <= r1 < size and 0 <= r2 < size and c1 < size and c2 < size):
+        raise ValueError("move off the board: %s" % text)
+    return (r1*size + c1) << 16 | (r2*size + c2)
+
+def side_text(id: int):
+    return Player(id).name.lower()
+
+def parse_side(text: str):
+    try:
+        return Player[text.upper()]
+    except KeyError:
+        raise ValueError("bad side: %s" % text)
@@ -0,0 +1,50 @@
+import random
+import pytest
+from model.player import Player
+from controller.halma import Board
+from controller.bitboard import BitBoard, make_board
+
+# BitBoard against the list Board: the same steps, apply/undo and counters along random playouts
+
+def counters(board):
+    return (board.count_finish_red, board.count_finish_green, board.cost, board.hash, board.occ,
+            board.pieces, [cell.pion for cell in board.flat])
+
+def step_keys(board, id):
+    steps = board.gen_all_pos_steps(id)
+    return None if steps is None else sorted(board.step_key(step) for step in steps)
+
+@pytest.mark.parametrize("size", [8, 10, 16])
+@pytest.mark.parametrize("move_cache", [True, False])
+def test_playouts_match_list_board(size, move_cache):
+    rng = random.Random(size)
+    for game in range(3):
+        board = Board(size, tt_size_mb=0, book=None, race=False, move_cache=move_cache)
+        bits = BitBoard(size, tt_size_mb=0, book=None, race=False, move_cache=move_cache)
+        id = Player.RED
+        for ply in range(60):
+            expected = step_keys(board, id)
+            assert step_keys(bits, id) == expected
+            if not expected:
+                break
+            # Every step undoes cleanly, then one is played
+            for step in rng.sample(board.gen_all_pos_steps(id), min(5, len(expected))):
+                before = counters(bits)
+                other = bits.to_step(board.step_key(step))
+                bits.apply_step(other)
+                board.apply_step(step)
+                assert counters(bits) == counters(board)
+                bits.undo_step(other)
+                board.undo_step(step)
+                assert counters(bits) == before == counters(board)
+            move = rng.choice(expected)
+            board.apply_move(move)
+            bits.apply_move(move)
+            assert counters(bits) == counters(board)
+            id = Player.GREEN if id == Player.RED else Player.RED
+
+def test_make_board():
+    assert type(make_board(8)) is Board
+    assert type(make_board(8, "bitboard", tt_size_mb=0)) is BitBoard
+    with pytest.raises(KeyError):
+        make_board(8, "numpy")
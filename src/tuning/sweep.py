@@ -0,0 +1,77 @@
+import argparse, itertools, json, os
+from concurrent.futures import ProcessPoolExecutor
+from arena.engine import EngineConfig, play_game
+from controller.settings import DEFAULT_PATH, local_settings, save_local_settings
+
+# Grid sweep of the minimax_with_local settings, from src:
+#   python -m tuning.sweep --size 8 --depth 2 --games 20 --workers 8
+# Every candidate plays --games games (alternating colors) against the current settings of
+# resource/config/search.json at the same depth, all games on one process pool. The best
+# candidate (score, then move time) is saved when it scores above 0.5
+
+GRID = {
+    "anneal_threshold": [0.8, 0.9, 0.95],
+    "sample_min": [20, 30, 40],
+    "sample_div": [1.2, 1.4, 1.8],
+}
+
+def candidates(grid: dict):
+    keys = sorted(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+def engine(settings: dict, depth: int, max_time: float):
+    # No book, the games test the search
+    return EngineConfig("local", max_time=max_time, depth=depth, book=False, **settings)
+
+def sweep(grid: dict, size: int = 8, depth: int = 2, max_time: float = -1, games: int = 10,
+          max_moves: int = 300, workers: int = None, path: str = DEFAULT_PATH):
+    # One result dict per candidate, best first
+    current = dict(local_settings(path))
+    baseline = engine(current, depth, max_time)
+    settings = list(candidates(grid))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for i, candidate in enumerate(settings):
+            challenger = engine(candidate, depth, max_time)
+            for game in range(games):
+                red, green = (challenger, baseline) if game % 2 == 0 else (baseline, challenger)
+                future = executor.submit(play_game, size, red, green, max_moves, i * games + game)
+                futures.append((i, "red" if game % 2 == 0 else "green", future))
+        results = [{"settings": candidate, "points": 0.0, "games": 0, "move_time": 0.0} for candidate in settings]
+        for i, side, future in futures:
+            game = future.result()
+            res = results[i]
+            res["games"] += 1
+            res["points"] += 1.0 if game["winner"] == side else 0.5 if game["winner"] is None else 0.0
+            res["move_time"] += game[side + "_move_time"]
+    for res in results:
+        res["score"] = res["points"] / res["games"]
+        res["move_time"] /= res["games"]
+    return sorted(results, key=lambda res: (-res["score"], res["move_time"]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tuning.sweep", description="Grid sweep of the local search settings")
+    parser.add_argument("--size", type=int, default=8, choices=(8, 10, 16))
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--max-time", type=float, default=-1, help="seconds per move, -1 for depth only")
+    parser.add_argument("--games", type=int, default=10, help="games per candidate")
+    parser.add_argument("--max-moves", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    for key, values in GRID.items():
+        parser.add_argument("--" + key.replace("_", "-"), type=type(values[0]), nargs="+", default=values)
+    parser.add_argument("--out", default=DEFAULT_PATH, help="settings file, read for the baseline and written")
+    args = parser.parse_args(argv)
+
+    grid = {key: getattr(args, key) for key in GRID}
+    results = sweep(grid, args.size, args.depth, args.max_time, args.games, args.max_moves, args.workers, args.out)
+    for res in results:
+        print(json.dumps(res))
+    best = results[0]
+    saved = best["score"] > 0.5
+    if saved:
+        save_local_settings(best["settings"], args.out)
+    print(json.dumps({"summary": True, "best": best["settings"], "score": best["score"], "saved": args.out if saved else None}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse, json, os
+import numpy as np
+from controller.evaluation import Evaluator, FEATURES, SIGNS, DEFAULT_PATH, default_evaluator
+from controller.halma import Board
+from controller.record import read_records
+from model.player import Player
+
+# Texel tuning of the evaluation weights, from src:
+#   python -m arena.selfplay --policy eval --games 20000 --record resource/records/selfplay.hgr
+#   python -m tuning.texel resource/records/selfplay.hgr resource/records/games.hgr
+# Every recorded position gets the result of its game (1 green won, 0 red won, 0.5 no winner).
+# The win probability of a position is sigmoid(k * score), k is fitted to the current weights
+# first, then the weights minimise the mean squared error of the predicted results. Every
+# test_every-th game is held out, the weights are saved (to the file the engine loads) only
+# when they predict the held-out games better
+
+def load_positions(paths, skip: int = 4):
+    # (states, results, games) arrays per board size, skipping the first plies (book moves)
+    data = {}
+    game = 0
+    for path in paths:
+        for record in read_records(path):
+            board = Board(record.size, tt_size_mb=0, evaluator=None, book=None, race=False)
+            states, results, games = data.setdefault(record.size, ([], [], []))
+            result = 0.5 if record.winner is None else float(record.winner == Player.GREEN)
+            for ply, (id, move) in enumerate(record.replay(board)):
+                if ply >= skip:
+                    states.append(board.encode()[1:])
+                    results.append(result)
+                    games.append(game)
+            game += 1
+    return {size: (np.frombuffer(b"".join(states), dtype=np.uint8).reshape(len(states), size*size),
+                   np.array(results), np.array(games))
+            for size, (states, results, games) in data.items() if states}
+
+def feature_rows(evaluator: Evaluator, data: dict):
+    # (X, y, games): X @ weights is the evaluation score of every position
+    X, y, games = [], [], []
+    for size, (states, results, game) in data.items():
+        features = evaluator.batch_features(size, states)
+        X.append((features[:, 1] - features[:, 0]) * np.array(SIGNS))
+        y.append(results)
+        games.append(game)
+    return np.concatenate(X), np.concatenate(y), np.concatenate(games)
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-np.clip(x, -500, 500)))
+
+def loss(X, y, weights, k: float):
+    return float(np.mean((y - sigmoid(k * (X @ weights))) ** 2))
+
+def fit_k(X, y, weights):
+    # Scale of the score, golden section search on log k
+    lo, hi = np.log(1e-4), np.log(10.0)
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(60):
+        a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        if loss(X, y, weights, np.exp(a)) < loss(X, y, weights, np.exp(b)):
+            hi = b
+        else:
+            lo = a
+    return float(np.exp((lo + hi) / 2))
+
+def fit_weights(X, y, weights, k: float, steps: int = 3000, rate: float = 0.01):
+    # Adam on the squared error, on standardised features so every weight moves at the same pace
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1
+    Xs = X / scale
+    w = np.array(weights, dtype=np.float64) * scale
+    m = np.zeros_like(w)
+    v = np.zeros_like(w)
+    for t in range(1, steps + 1):
+        p = sigmoid(k * (Xs @ w))
+        grad = -2 * k * Xs.T @ ((y - p) * p * (1 - p)) / len(y)
+        m = 0.9 * m + 0.1 * grad
+        v = 0.999 * v + 0.001 * grad * grad
+        w -= rate * (m / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + 1e-12)
+    return w / scale
+
+def tune(paths, out: str = DEFAULT_PATH, skip: int = 4, test_every: int = 5, steps: int = 3000):
+    current = Evaluator.load(out) if os.path.exists(out) else default_evaluator()
+    data = load_positions(paths, skip)
+    if not data:
+        raise ValueError("no positions in " + ", ".join(paths))
+    X, y, games = feature_rows(current, data)
+    test = games % test_every == 0
+    w0 = np.array(current.weights)
+    k = fit_k(X[~test], y[~test], w0)
+    w = fit_weights(X[~test], y[~test], w0, k, steps)
+    report = {
+        "positions": len(y), "games": int(games.max()) + 1, "k": k,
+        "train_before": loss(X[~test], y[~test], w0, k), "train_after": loss(X[~test], y[~test], w, k),
+        "test_before": loss(X[test], y[test], w0, k), "test_after": loss(X[test], y[test], w, k),
+        "weights": {name: round(float(value), 4) for name, value in zip(FEATURES, w)},
+        "saved": None,
+    }
+    if report["test_after"] < report["test_before"]:
+        Evaluator(report["weights"]).save(out)
+        report["saved"] = out
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tuning.texel", description="Fit the evaluation weights to game results")
+    parser.add_argument("archive", nargs="+", help="game archives (python -m arena.selfplay --record, the GUI, python -m arena --record)")
+    parser.add_argument("--out", default=DEFAULT_PATH, help="weights file, read for the starting weights and written")
+    parser.add_argument("--skip", type=int, default=4, help="opening plies left out of every game")
+    parser.add_argument("--test-every", type=int, default=5, help="every n-th game is held out")
+    parser.add_argument("--steps", type=int, default=3000)
+    args = parser.parse_args(argv)
+    print(json.dumps(tune(args.archive, args.out, args.skip, args.test_every, args.steps)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+from model import *
+
+# Both boards take the window's grid layout, the pion pixmaps (loaded once) and a
+# clicked(row, col) callback, and offer build/setPion/highlight/clear.
+# Only the cells given to setPion are redrawn, highlight options: none, yellow (selected pion), red (legal move)
+
+CELL_COLORS = {
+    CellType.RED_HOUSE: "#ef5350",
+    CellType.GREEN_HOUSE: "#66bb6a",
+    CellType.NEUTRAL: "#bdbdbd",
+}
+
+def cellStyleSheet(cellType: CellType):
+    # Highlights use the :default and :checked pseudo-states, switching them needs no repolish
+    return """QPushButton {{
+                  background-color: {bgColor};
+                  border-radius: 0;
+                  border: 1px solid #1b1b1b;
+              }}
+              QPushButton:checked {{ background-color: {bgColor}; border: 2px solid red; }}
+              QPushButton:default {{ border: 2px solid yellow; }}
+              QPushButton:hover {{
+                  border: 2px solid yellow;
+              }}""".format(bgColor=CELL_COLORS[cellType])
+
+class ButtonBoard:
+    # One push button per cell, pions are button icons
+    def __init__(self, layout, pixmaps, clicked):
+        self.layout = layout
+        self.icons = {pion: QIcon(pixmap) for pion, pixmap in pixmaps.items()}
+        self.icons[Pion.NONE] = QIcon()
+        self.clicked = clicked
+        self.buttons = []
+        self.shown = []
+
+    def build(self, board):
+        # One style sheet per cell type, shared by the buttons
+        styles = {cellType: cellStyleSheet(cellType) for cellType in CELL_COLORS}
+        for r, cellRow in enumerate(board.cells):
+            buttons = []
+            for c, cell in enumerate(cellRow):
+                button = QPushButton()
+                button.setCheckable(True)
+                button.clicked.connect(lambda checked, r=r, c=c: self.onClicked(r, c, checked))
+                button.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
+                button.setStyleSheet(styles[cell.owner])
+                self.layout.addWidget(button, r, c)
+                buttons.append(button)
+            self.buttons.append(buttons)
+            self.shown.append([Pion.NONE] * len(cellRow))
+        for cell in board.flat:
+            self.setPion(cell.row, cell.col, cell.pion)
+
+    def onClicked(self, row, col, checked):
+        # Undo the toggle of the click, the checked state is only set by highlight
+        self.buttons[row][col].setChecked(not checked)
+        self.clicked(row, col)
+
+    def setPion(self, row, col, pion):
+        if self.shown[row][col] != pion:
+            self.shown[row][col] = pion
+            self.buttons[row][col].setIcon(self.icons[pion])
+
+    def highlight(self, row, col, option):
+        button = self.buttons[row][col]
+        button.setDefault(option == "yellow")
+        button.setChecked(option == "red")
+
+    def clear(self):
+        for buttons in self.buttons:
+            for button in buttons:
+                button.setParent(None)
+        self.buttons = []
+        self.shown = []
+
+class GraphicsBoard(QGraphicsView):
+    # The whole board on one QGraphicsScene, scaled to the view: a rect item per cell and a
+    # pixmap item per pion, cheaper than size*size buttons on the large boards
+    CELL = 40
+
+    def __init__(self, layout, pixmaps, clicked):
+        super(GraphicsBoard, self).__init__()
+        self.layout = layout
+        self.pixmaps = {pion: pixmap.scaled(self.CELL - 6, self.CELL - 6, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                        for pion, pixmap in pixmaps.items()}
+        self.clicked = clicked
+        self.pens = {
+            "none": QPen(QColor("#1b1b1b"), 1),
+            "yellow": QPen(QColor("yellow"), 3),
+            "red": QPen(QColor("red"), 3),
+        }
+        self.setScene(QGraphicsScene(self))
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.size = 0
+        self.rects = []
+        self.pions = []
+        self.shown = []
+
+    def build(self, board):
+        scene = self.scene()
+        self.size = board.size
+        for r, cellRow in enumerate(board.cells):
+            rects, pions = [], []
+            for c, cell in enumerate(cellRow):
+                rect = scene.addRect(c * self.CELL, r * self.CELL, self.CELL, self.CELL,
+                                     self.pens["none"], QBrush(QColor(CELL_COLORS[cell.owner])))
+                pion = scene.addPixmap(QPixmap())
+                pion.setPos(c * self.CELL + 3, r * self.CELL + 3)
+                pion.setZValue(2)
+                rects.append(rect)
+                pions.append(pion)
+            self.rects.append(rects)
+            self.pions.append(pions)
+            self.shown.append([Pion.NONE] * len(cellRow))
+        for cell in board.flat:
+            self.setPion(cell.row, cell.col, cell.pion)
+        self.layout.addWidget(self, 0, 0)
+        self.fitInView(scene.sceneRect(), Qt.KeepAspectRatio)
+
+    def resizeEvent(self, event):
+        super(GraphicsBoard, self).resizeEvent(event)
+        self.fitInView(self.scene().sceneRect(), Qt.KeepAspectRatio)
+
+    def mousePressEvent(self, event):
+        pos = self.mapToScene(event.pos())
+        r, c = int(pos.y() // self.CELL), int(pos.x() // self.CELL)
+        if 0 <= r < self.size and 0 <= c < self.size:
+            self.clicked(r, c)
+
+    def setPion(self, row, col, pion):
+        if self.shown[row][col] != pion:
+            self.shown[row][col] = pion
+            self.pions[row][col].setPixmap(self.pixmaps.get(pion, QPixmap()))
+
+    def highlight(self, row, col, option):
+        rect = self.rects[row][col]
+        rect.setPen(self.pens[option])
+        # Thick borders drawn over the neighbours
+        rect.setZValue(0 if option == "none" else 1)
+
+    def clear(self):
+        self.setParent(None)
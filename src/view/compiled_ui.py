@@ -0,0 +1,23 @@
+import importlib
+import os
+
+# The .ui files are compiled to Python with pyuic5 and the modules are committed next to them, so
+# starting the GUI neither imports PyQt5.uic nor parses the XML. After editing a .ui file, from src:
+#   pyuic5 view/main_window.ui -o view/ui_main_window.py
+# A module missing or older than its .ui file is not used, the .ui file is loaded with loadUi instead
+
+VIEW_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def setupUi(widget, name: str):
+    # Builds view/<name>.ui into widget, the child widgets become attributes of widget (as loadUi does)
+    uiPath = os.path.join(VIEW_DIR, name + ".ui")
+    modulePath = os.path.join(VIEW_DIR, "ui_" + name + ".py")
+    if not os.path.exists(modulePath) or os.path.getmtime(modulePath) < os.path.getmtime(uiPath):
+        from PyQt5.uic import loadUi
+        loadUi(uiPath, widget)
+        return
+    module = importlib.import_module(".ui_" + name, __package__)
+    ui = next(getattr(module, attr) for attr in dir(module) if attr.startswith("Ui_"))()
+    ui.setupUi(widget)
+    for attr, value in vars(ui).items():
+        setattr(widget, attr, value)
@@ -1,14 +1,21 @@
 import os
 import time
 from enum import IntEnum
-from PyQt5.uic import loadUi
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from .compiled_ui import setupUi
 from .worker import Worker
+from .board_widgets import ButtonBoard, GraphicsBoard
 from model import *
 from controller import *
+from controller.bitboard import make_board
+from controller.ponder import Ponder
+from controller.record import GameRecord, RECORD_DIR, append_record
+
+# resource/image, found through the image: prefix (style sheets of main_window.ui, pion pixmaps)
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resource", "image")
 
 class PageIdx(IntEnum):
     MAIN_MENU = 0
@@ -22,11 +29,16 @@ class GameMode(IntEnum):
     HUMAN_MINIMAX = 1
     HUMAN_LOCAL = 2
     MINIMAX_LOCAL = 3
+    HUMAN_MCTS = 4
+    MINIMAX_MCTS = 5
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super(MainWindow, self).__init__()
-        loadUi(os.path.join(os.getcwd(), "view", "main_window.ui"), self)
+        QDir.setSearchPaths("image", [IMAGE_DIR])
+        # the 2400x1800 background (17 MB decoded) must fit the pixmap cache, else every styled widget decodes it again
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 32 * 1024))
+        setupUi(self, "main_window")
         self.gameState = None
         self.actCell = None
         self.boardSize = 0
@@ -41,10 +53,38 @@ class MainWindow(QMainWindow):
         self.threadPool = QThreadPool()
         self.workerMinimax = None
         self.workerLocal = None
+        self.workerMCTS = None
+        # multiprocess minimax, enabled with HALMA_WORKERS > 1
+        workers = int(os.environ.get("HALMA_WORKERS", "1"))
+        self.parallelSearch = None
+        if workers > 1:
+            # imported here, multiprocessing is not loaded by a single process GUI
+            from controller.parallel import ParallelSearch
+            self.parallelSearch = ParallelSearch(workers)
+        # search during the human's turn in human vs minimax/local, disabled with HALMA_PONDER=0
+        self.usePonder = os.environ.get("HALMA_PONDER", "1") != "0"
+        self.ponder = None
+        # pion images, loaded once
+        self.pionPixmaps = {
+            Pion.RED: QPixmap("image:pion_red.png"),
+            Pion.GREEN: QPixmap("image:pion_green.png"),
+        }
+        # board widget: push buttons, or one scaled QGraphicsView with HALMA_BOARD_VIEW=graphics
+        self.useGraphicsBoard = os.environ.get("HALMA_BOARD_VIEW", "buttons") == "graphics"
+        # board backend, HALMA_BACKEND=bitboard for the bitmask move generation (controller/bitboard.py)
+        self.boardBackend = os.environ.get("HALMA_BACKEND", "array")
+        self.boardUI = None
+        # game archive every game is appended to, HALMA_RECORD= (empty) to disable
+        self.recordPath = os.environ.get("HALMA_RECORD", os.path.join(RECORD_DIR, "games.hgr"))
+        self.record = None
+        # adjudication: draw after HALMA_MAX_MOVES moves or on HALMA_REPETITIONS-fold repetition (0 disables)
+        self.maxMoves = int(os.environ.get("HALMA_MAX_MOVES", "400"))
+        self.repetitionLimit = int(os.environ.get("HALMA_REPETITIONS", "3"))
         # timer
         self.timerStart = 0
         self.timerMinimax = 0
         self.timerLocal = 0
+        self.timerMCTS = 0
 
     def setupUI(self):
         # main menu page
@@ -58,6 +98,8 @@ class MainWindow(QMainWindow):
         self.humanVsMinimax.clicked.connect(lambda:self.setGameMode(GameMode.HUMAN_MINIMAX))
         self.humanVsLocalSearch.clicked.connect(lambda:self.setGameMode(GameMode.HUMAN_LOCAL))
         self.minimaxVsLocalSearch.clicked.connect(lambda:self.setGameMode(GameMode.MINIMAX_LOCAL))
+        self.humanVsMCTS.clicked.connect(lambda:self.setGameMode(GameMode.HUMAN_MCTS))
+        self.minimaxVsMCTS.clicked.connect(lambda:self.setGameMode(GameMode.MINIMAX_MCTS))
         # select side page
         self.pRedBtn.clicked.connect(lambda: self.setHumanPlayer(Player.RED))
         self.pGreenBtn.clicked.connect(lambda: self.setHumanPlayer(Player.GREEN))
@@ -72,26 +114,16 @@ class MainWindow(QMainWindow):
                                             callback=quitConfirmation))
 
     def initBoardUI(self):
-        for r, cellRow in enumerate(self.gameState.board.cells):
-            for c, cell in enumerate(cellRow):
-                button = QPushButton()
-                button.clicked.connect(self.cellClickedHandler)
-                button.setProperty("highlight", "none")
-                button.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
-                button.setStyleSheet(self.getCellStyleSheet(cell.owner))
-                self.fields.addWidget(button, r, c)
-        self.updatePionPositionUI()
+        boardClass = GraphicsBoard if self.useGraphicsBoard else ButtonBoard
+        self.boardUI = boardClass(self.fields, self.pionPixmaps, self.cellClickedHandler)
+        self.boardUI.build(self.gameState.board)
         self.updatePlayerTurnUI()
 
-    def updatePionPositionUI(self):
-        for r, cellRow in enumerate(self.gameState.board.cells):
-            for c, cell in enumerate(cellRow):
-                button = self.fields.itemAtPosition(r, c).widget()
-                if cell.pion == Pion.NONE:
-                    button.setIcon(QIcon()); continue;
-                icon_filename = "pion_red.png" if cell.pion == Pion.RED else "pion_green.png"
-                icon_path = os.path.join(os.getcwd(), "resource", "image", icon_filename)
-                button.setIcon(QIcon(icon_path))
+    def updatePionPositionUI(self, step=None):
+        # only the two cells of the last step, every cell without step
+        cells = self.gameState.board.flat if step is None else step
+        for cell in cells:
+            self.boardUI.setPion(cell.row, cell.col, cell.pion)
 
     def updatePlayerTurnUI(self):
         if self.gameState.act_player == Player.GREEN:
@@ -99,22 +131,44 @@ class MainWindow(QMainWindow):
         else:
             self.curPlayer.setText("RED'S TURN")
 
+    def timeRecap(self):
+        if self.gameMode == GameMode.HUMAN_MINIMAX:
+            return "Time Needed by Minimax Bot = " + str(self.timerMinimax) + " s."
+        elif self.gameMode == GameMode.HUMAN_LOCAL:
+            return "Time Needed by Local Bot = " + str(self.timerLocal) + " s."
+        elif self.gameMode == GameMode.HUMAN_MCTS:
+            return "Time Needed by MCTS Bot = " + str(self.timerMCTS) + " s."
+        elif self.gameMode == GameMode.MINIMAX_MCTS:
+            return "Time Needed by Minimax Bot = " + str(self.timerMinimax) + " s and MCTS Bot = " + str(self.timerMCTS) + " s."
+        else:
+            return "Time Needed by Minimax Bot = " + str(self.timerMinimax) + " s and Local Bot = " + str(self.timerLocal) + " s."
+
+    def restartOrQuitGame(self, btn):
+        self.quitGame()
+        if btn.text() == "Yes":
+            self.startGame(self.humanPlayer, self.boardSize, self.maxTime.value())
+
     def checkWinnerUI(self):
         winner = self.gameState.check_winner()
         if winner is not None:
-            def restartOrQuitGame(btn):
-                self.quitGame()
-                if btn.text() == "Yes":
-                    self.startGame(self.humanPlayer, self.boardSize, self.maxTime.value())
+            if self.record is not None:
+                self.record.winner = winner
             # spawn winner window
-            if self.gameMode == GameMode.HUMAN_MINIMAX:
-                timeRecap = "Time Needed by Minimax Bot = " + str(self.timerMinimax) + " s."
-            elif self.gameMode == GameMode.HUMAN_LOCAL:
-                timeRecap = "Time Needed by Local Bot = " + str(self.timerLocal) + " s."
+            self.spawnDialogWindow("Game Ended", "The Winner is Player " + winner.name + ". " + self.timeRecap(),
+                                   subtext="Restart Game?", callback=self.restartOrQuitGame)
+            return True
+        return False
+
+    def checkAdjudicationUI(self):
+        # called after next_turn, ends looping games as a draw
+        reason = self.gameState.adjudicate()
+        if reason is not None:
+            if reason == "move_cap":
+                text = "Draw after " + str(self.gameState.moves) + " moves. "
             else:
-                timeRecap = "Time Needed by Minimax Bot = " + str(self.timerMinimax) + " s and Local Bot = " + str(self.timerLocal) + " s."
-            self.spawnDialogWindow("Game Ended", "The Winner is Player " + winner.name + ". " + timeRecap,
-                                   subtext="Restart Game?", callback=restartOrQuitGame)
+                text = "Draw by " + str(self.gameState.repetition_limit) + "-fold repetition. "
+            self.spawnDialogWindow("Game Ended", text + self.timeRecap(),
+                                   subtext="Restart Game?", callback=self.restartOrQuitGame)
             return True
         return False
 
@@ -125,55 +179,70 @@ class MainWindow(QMainWindow):
         self.changePage(PageIdx.IN_GAME)
         self.timerMinimax = 0
         self.timerLocal = 0
-        if self.gameMode == GameMode.MINIMAX_LOCAL:  # AI vs AI
+        self.timerMCTS = 0
+        if self.gameMode in (GameMode.MINIMAX_LOCAL, GameMode.MINIMAX_MCTS):  # AI vs AI
             self.calculateAIMoveMinimax()
         elif self.gameMode == GameMode.HUMAN_LOCAL:  # Human vs AI local
             # AI move first not hum_player
             if self.gameState.act_player != self.gameState.hum_player:
                 self.calculateAIMoveLocal()
+        elif self.gameMode == GameMode.HUMAN_MCTS:  # Human vs AI MCTS
+            # AI move first not hum_player
+            if self.gameState.act_player != self.gameState.hum_player:
+                self.calculateAIMoveMCTS()
         else:  # self.gameMode == GameMode.HUMAN_MINIMAX  # Human vs AI local
             # AI move first not hum_player
             if self.gameState.act_player != self.gameState.hum_player:
                 self.calculateAIMoveMinimax()
 
     def quitGame(self):
-        for idx in reversed(range(self.fields.count())):
-            self.fields.itemAt(idx).widget().setParent(None)
-        # disconnect worker signal
-        if self.workerMinimax is not None:
+        if self.boardUI is not None:
+            self.boardUI.clear()
+            self.boardUI = None
+        # cancel running searches and disconnect worker signal
+        for worker in (self.workerMinimax, self.workerLocal, self.workerMCTS):
+            if worker is None:
+                continue
+            worker.cancel()
             try:
-                self.workerMinimax.signals.exception.disconnect(self.minimaxThreadException)
-                self.workerMinimax.signals.result.disconnect(self.minimaxThreadResult)
-                self.workerMinimax.signals.done.disconnect(self.minimaxThreadDone)
+                worker.signals.exception.disconnect(self.minimaxThreadException)
+                worker.signals.result.disconnect(self.minimaxThreadResult)
+                worker.signals.done.disconnect(self.minimaxThreadDone)
             except Exception as e:
                 pass
-        if self.workerLocal is not None:
+        self.workerMinimax = self.workerLocal = self.workerMCTS = None
+        # save the game
+        if self.record is not None and len(self.record) > 0 and self.recordPath:
             try:
-                self.workerLocal.signals.exception.disconnect(self.minimaxThreadException)
-                self.workerLocal.signals.result.disconnect(self.minimaxThreadResult)
-                self.workerLocal.signals.done.disconnect(self.minimaxThreadDone)
-            except Exception as e:
-                pass
+                append_record(self.recordPath, self.record)
+            except OSError as e:
+                print("Could not save game record:", e)
+        self.record = None
+        # stop pondering
+        if self.ponder is not None:
+            self.ponder.stop()
+            self.ponder = None
         # clean game state and return to main menu
         self.gameState = None
         self.changePage(PageIdx.MAIN_MENU)
 
-    def cellClickedHandler(self):
-        button = self.sender()
-        r, c, _, _ = self.fields.getItemPosition(self.fields.indexOf(button))
-        # highlight helper
-        def highlightBtn(btn, option):  # option: {none, yellow, red}
-            btn.setProperty("highlight", option); btn.setStyle(btn.style());
+    def cellClickedHandler(self, r, c):
+        # highlight helper, option: {none, yellow, red}
+        highlightBtn = self.boardUI.highlight
         # update old active cell and old legal moves
         if self.actCell:
-            highlightBtn(self.fields.itemAtPosition(*self.actCell).widget(), "none")
+            highlightBtn(*self.actCell, "none")
         for oldLegalMove in self.legalMoves:
-            highlightBtn(self.fields.itemAtPosition(oldLegalMove[1].row, oldLegalMove[1].col).widget(), "none")
+            highlightBtn(oldLegalMove[1].row, oldLegalMove[1].col, "none")
         # move or select pion
         if self.actCell and (self.gameState.board[self.actCell[0], self.actCell[1]], self.gameState.board[r, c]) in self.legalMoves:  # moving pion
             # move pion
-            self.gameState.board.apply_step((self.gameState.board[self.actCell[0], self.actCell[1]], self.gameState.board[r, c]))
-            self.updatePionPositionUI()
+            humanStep = (self.gameState.board[self.actCell[0], self.actCell[1]], self.gameState.board[r, c])
+            humanMove = self.gameState.board.step_key(humanStep)
+            self.gameState.board.apply_step(humanStep)
+            self.updatePionPositionUI(humanStep)
+            self.record.add(humanMove, None, time.time() - self.turnStart)
+            self.turnStart = time.time()
             # update new active cell and new legal moves
             self.actCell = None
             self.legalMoves = []
@@ -182,24 +251,27 @@ class MainWindow(QMainWindow):
             # next turn: AI move
             self.gameState.next_turn()
             self.updatePlayerTurnUI()
+            if self.checkAdjudicationUI(): return
             # calculate AI move
             if self.gameMode == GameMode.HUMAN_LOCAL:
-                self.calculateAIMoveLocal()
+                self.calculateAIMoveLocal(humanMove)
+            elif self.gameMode == GameMode.HUMAN_MCTS:
+                self.calculateAIMoveMCTS()
             else:  # self.gameMode == GameMode.HUMAN_MINIMAX
-                self.calculateAIMoveMinimax()
+                self.calculateAIMoveMinimax(humanMove)
         else:  # selecting pion
             # pion check if existing and owned
             cell = self.gameState.board[r, c]
             if (not cell.occupied_by(self.gameState.hum_player)
                 or self.gameState.act_player != self.gameState.hum_player
-                or self.gameMode == GameMode.MINIMAX_LOCAL):
-                highlightBtn(button, "none"); self.actCell = None; self.legalMoves = []; return;
+                or self.gameMode in (GameMode.MINIMAX_LOCAL, GameMode.MINIMAX_MCTS)):
+                highlightBtn(r, c, "none"); self.actCell = None; self.legalMoves = []; return;
             # update new active cell and new legal moves
             self.actCell = (r, c)
             self.legalMoves = self.gameState.board.legal_moves(r, c, self.gameState.hum_player)
-            highlightBtn(button, "yellow")
+            highlightBtn(r, c, "yellow")
             for legalMove in self.legalMoves:
-                highlightBtn(self.fields.itemAtPosition(legalMove[1].row, legalMove[1].col).widget(), "red")
+                highlightBtn(legalMove[1].row, legalMove[1].col, "red")
 
     def setBoardSize(self, boardSize):
         self.boardSize = boardSize
@@ -207,7 +279,7 @@ class MainWindow(QMainWindow):
 
     def setGameMode(self, gameMode):
         self.gameMode = gameMode
-        if self.gameMode == GameMode.MINIMAX_LOCAL:
+        if self.gameMode in (GameMode.MINIMAX_LOCAL, GameMode.MINIMAX_MCTS):
             self.setHumanPlayer(None)
         else:
             self.changePage(PageIdx.SELECT_SIDE)
@@ -218,13 +290,27 @@ class MainWindow(QMainWindow):
 
     # Game methods
     def initGameState(self, humanPlayer, boardSize, max_time):
-        board = Board(boardSize, max_time=max_time)
-        self.gameState = GameState(board, humanPlayer)
+        # whole-game clock of every engine side (shared out over its moves, capped by max_time), 0 for none
+        gameTime = self.gameTime.value() or None
+        board = make_board(boardSize, self.boardBackend, max_time=max_time, game_time=gameTime)
+        self.gameState = GameState(board, humanPlayer, max_moves=self.maxMoves or None, repetition_limit=self.repetitionLimit)
+        self.record = GameRecord(boardSize, {"mode": self.gameMode.name, "human": None if humanPlayer is None else humanPlayer.name.lower(), "max_time": max_time, "game_time": gameTime})
+        self.turnStart = time.time()
+        if self.usePonder and self.gameMode in (GameMode.HUMAN_MINIMAX, GameMode.HUMAN_LOCAL):
+            self.ponder = Ponder(board)
 
-    def calculateAIMoveMinimax(self):
+    def calculateAIMoveMinimax(self, humanMove=None):
         print('ai move minimax')
         # Create worker instance
-        self.workerMinimax = Worker(self.gameState.board.minimax, self.gameState.act_player)
+        board = self.gameState.board
+        if self.parallelSearch is not None:
+            search = lambda id, stop=None: self.parallelSearch.minimax(board, id, stop)
+        else:
+            search = board.minimax
+        if self.ponder is not None and humanMove is not None:
+            self.workerMinimax = Worker(self.ponder.answer, humanMove, self.gameState.act_player, search, cancellable=True)
+        else:
+            self.workerMinimax = Worker(search, self.gameState.act_player, cancellable=True)
         # Connect signals
         self.workerMinimax.signals.exception.connect(self.minimaxThreadException)
         self.workerMinimax.signals.result.connect(self.minimaxThreadResult)
@@ -233,10 +319,14 @@ class MainWindow(QMainWindow):
         self.timerStart = time.time()
         self.threadPool.start(self.workerMinimax)
 
-    def calculateAIMoveLocal(self):
+    def calculateAIMoveLocal(self, humanMove=None):
         print('ai move local')
         # Create worker instance
-        self.workerLocal = Worker(self.gameState.board.minimax_with_local, self.gameState.act_player)
+        search = self.gameState.board.minimax_with_local
+        if self.ponder is not None and humanMove is not None:
+            self.workerLocal = Worker(self.ponder.answer, humanMove, self.gameState.act_player, search, cancellable=True)
+        else:
+            self.workerLocal = Worker(search, self.gameState.act_player, cancellable=True)
         # Connect signals
         self.workerLocal.signals.exception.connect(self.minimaxThreadException)
         self.workerLocal.signals.result.connect(self.minimaxThreadResult)
@@ -245,6 +335,18 @@ class MainWindow(QMainWindow):
         self.timerStart = time.time()
         self.threadPool.start(self.workerLocal)
 
+    def calculateAIMoveMCTS(self):
+        print('ai move mcts')
+        # Create worker instance
+        self.workerMCTS = Worker(self.gameState.board.mcts, self.gameState.act_player, cancellable=True)
+        # Connect signals
+        self.workerMCTS.signals.exception.connect(self.minimaxThreadException)
+        self.workerMCTS.signals.result.connect(self.minimaxThreadResult)
+        self.workerMCTS.signals.done.connect(self.minimaxThreadDone)
+        # Run thread
+        self.timerStart = time.time()
+        self.threadPool.start(self.workerMCTS)
+
     def minimaxThreadException(self, exception):
         print(exception)
 
@@ -252,13 +354,19 @@ class MainWindow(QMainWindow):
         step = res[1]
         if step is None:
             print("No move available"); return
+        # search summary from the engine statistics
+        stats = res.stats
+        self.statusBar().showMessage("%s: depth %d, %d nodes, %.0f nodes/s" % (stats.engine, stats.depth, stats.nodes, stats.nps))
         self.gameState.board.apply_step(step)
-        self.updatePionPositionUI()
+        self.updatePionPositionUI(step)
+        self.record.add(self.gameState.board.step_key(step), res.value, time.time() - self.timerStart)
+        self.turnStart = time.time()
         # check if AI win
         if self.checkWinnerUI(): return
         # next turn: human move
         self.gameState.next_turn()
         self.updatePlayerTurnUI()
+        if self.checkAdjudicationUI(): return
         # next AI player if AI vs AI, else return control to human
         if self.gameMode == GameMode.MINIMAX_LOCAL:
             if self.gameState.act_player == Player.GREEN:
@@ -267,10 +375,23 @@ class MainWindow(QMainWindow):
             else:
                 self.timerLocal += time.time() - self.timerStart
                 self.calculateAIMoveMinimax()
+        elif self.gameMode == GameMode.MINIMAX_MCTS:
+            if self.gameState.act_player == Player.GREEN:
+                self.timerMinimax += time.time() - self.timerStart
+                self.calculateAIMoveMCTS()
+            else:
+                self.timerMCTS += time.time() - self.timerStart
+                self.calculateAIMoveMinimax()
         elif self.gameMode == GameMode.HUMAN_LOCAL:
             self.timerLocal += time.time() - self.timerStart
+            if self.ponder is not None:
+                self.ponder.start(self.gameState.act_player, "minimax_with_local")
+        elif self.gameMode == GameMode.HUMAN_MCTS:
+            self.timerMCTS += time.time() - self.timerStart
         else:  # self.gameMode == GameMode.HUMAN_MINIMAX
             self.timerMinimax += time.time() - self.timerStart
+            if self.ponder is not None:
+                self.ponder.start(self.gameState.act_player, "minimax")
 
     def minimaxThreadDone(self):
         print("AI move calculation done")
@@ -294,19 +415,3 @@ class MainWindow(QMainWindow):
         message.addButton(noBtnLbl, QMessageBox.NoRole)
         if callback: message.buttonClicked.connect(callback)
         message.exec_()
-
-    def getCellStyleSheet(self, cellType: CellType):
-        bgColor = ("#ef5350" if cellType == CellType.RED_HOUSE else
-                   "#66bb6a" if cellType == CellType.GREEN_HOUSE else
-                   "#bdbdbd")
-        stylesheet = """QPushButton {{
-                            background-color: {bgColor};
-                            border-radius: 0;
-                        }}
-                        QPushButton[highlight='none'] {{ border: 1px solid #1b1b1b; }}
-                        QPushButton[highlight='yellow'] {{ border: 2px solid yellow; }}
-                        QPushButton[highlight='red'] {{ border: 2px solid red; }}
-                        QPushButton:hover {{
-                            border: 2px solid yellow;
-                        }}""".format(bgColor=bgColor)
-        return stylesheet
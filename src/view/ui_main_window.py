@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'view/main_window.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1119, 809)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setStyleSheet("")
+        self.centralwidget.setObjectName("centralwidget")
+        self.stackedWidget = QtWidgets.QStackedWidget(self.centralwidget)
+        self.stackedWidget.setGeometry(QtCore.QRect(-1, 0, 1121, 811))
+        self.stackedWidget.setStyleSheet("")
+        self.stackedWidget.setObjectName("stackedWidget")
+        self.mainMenuPage = QtWidgets.QWidget()
+        self.mainMenuPage.setStyleSheet("border-image: url(\"image:White-Background.jpg\") 0 0 0 0 stretch stretch;")
+        self.mainMenuPage.setObjectName("mainMenuPage")
+        self.mainTitle = QtWidgets.QLabel(self.mainMenuPage)
+        self.mainTitle.setGeometry(QtCore.QRect(330, 230, 471, 71))
+        font = QtGui.QFont()
+        font.setFamily("Candara")
+        font.setPointSize(36)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(9)
+        self.mainTitle.setFont(font)
+        self.mainTitle.setStyleSheet("background: rgba(255, 255, 255, 0.8);\n"
+"border-image: none;\n"
+"font: 75 36pt \"Candara\";")
+        self.mainTitle.setTextFormat(QtCore.Qt.AutoText)
+        self.mainTitle.setAlignment(QtCore.Qt.AlignCenter)
+        self.mainTitle.setObjectName("mainTitle")
+        self.mainMenuGroup = QtWidgets.QGroupBox(self.mainMenuPage)
+        self.mainMenuGroup.setGeometry(QtCore.QRect(420, 300, 291, 221))
+        self.mainMenuGroup.setStyleSheet("border-image: none;\n"
+"border: none;\n"
+"font: 20pt \"Courier New\";")
+        self.mainMenuGroup.setTitle("")
+        self.mainMenuGroup.setObjectName("mainMenuGroup")
+        self.exitBtn = QtWidgets.QPushButton(self.mainMenuGroup)
+        self.exitBtn.setGeometry(QtCore.QRect(20, 110, 251, 61))
+        font = QtGui.QFont()
+        font.setFamily("Courier New")
+        font.setPointSize(20)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.exitBtn.setFont(font)
+        self.exitBtn.setStyleSheet("background: rgb(211, 215, 240);\n"
+"color: #000000;\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;")
+        self.exitBtn.setObjectName("exitBtn")
+        self.playGameBtn = QtWidgets.QPushButton(self.mainMenuGroup)
+        self.playGameBtn.setGeometry(QtCore.QRect(20, 40, 251, 61))
+        palette = QtGui.QPalette()
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Active, QtGui.QPalette.Button, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Active, QtGui.QPalette.Base, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Active, QtGui.QPalette.Window, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Inactive, QtGui.QPalette.Button, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Inactive, QtGui.QPalette.Base, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Inactive, QtGui.QPalette.Window, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Disabled, QtGui.QPalette.Button, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Disabled, QtGui.QPalette.Base, brush)
+        brush = QtGui.QBrush(QtGui.QColor(84, 187, 255))
+        brush.setStyle(QtCore.Qt.SolidPattern)
+        palette.setBrush(QtGui.QPalette.Disabled, QtGui.QPalette.Window, brush)
+        self.playGameBtn.setPalette(palette)
+        font = QtGui.QFont()
+        font.setFamily("Courier New")
+        font.setPointSize(20)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.playGameBtn.setFont(font)
+        self.playGameBtn.setAutoFillBackground(False)
+        self.playGameBtn.setStyleSheet("border-radius: 30px;\n"
+"background-color: rgb(84, 187, 255);\n"
+"border: 2px solid #000;\n"
+"")
+        self.playGameBtn.setObjectName("playGameBtn")
+        self.label = QtWidgets.QLabel(self.mainMenuPage)
+        self.label.setGeometry(QtCore.QRect(530, 120, 81, 81))
+        self.label.setStyleSheet("border-image: url(\"image:icon.png\") 0 0 0 0 stretch stretch;")
+        self.label.setObjectName("label")
+        self.stackedWidget.addWidget(self.mainMenuPage)
+        self.selectBoardSizeMenuPage = QtWidgets.QWidget()
+        self.selectBoardSizeMenuPage.setStyleSheet("background-image: url(\"image:White-Background.jpg\") 0 0 0 0 stretch stretch;")
+        self.selectBoardSizeMenuPage.setObjectName("selectBoardSizeMenuPage")
+        self.selectSizeTitle = QtWidgets.QLabel(self.selectBoardSizeMenuPage)
+        self.selectSizeTitle.setGeometry(QtCore.QRect(310, 180, 521, 91))
+        font = QtGui.QFont()
+        font.setFamily("Candara")
+        font.setPointSize(30)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.selectSizeTitle.setFont(font)
+        self.selectSizeTitle.setStyleSheet("background: none;\n"
+"border-image: none;\n"
+"font: 30pt \"Candara\";")
+        self.selectSizeTitle.setTextFormat(QtCore.Qt.AutoText)
+        self.selectSizeTitle.setAlignment(QtCore.Qt.AlignCenter)
+        self.selectSizeTitle.setObjectName("selectSizeTitle")
+        self.selectSizeGroup = QtWidgets.QGroupBox(self.selectBoardSizeMenuPage)
+        self.selectSizeGroup.setGeometry(QtCore.QRect(420, 260, 291, 321))
+        self.selectSizeGroup.setStyleSheet("background: none;\n"
+"border: none;\n"
+"font: 24pt \"Courier New\";")
+        self.selectSizeGroup.setTitle("")
+        self.selectSizeGroup.setObjectName("selectSizeGroup")
+        self.eight = QtWidgets.QPushButton(self.selectSizeGroup)
+        self.eight.setGeometry(QtCore.QRect(20, 30, 251, 71))
+        self.eight.setStyleSheet("background-color: rgb(129, 255, 198);\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;")
+        self.eight.setObjectName("eight")
+        self.ten = QtWidgets.QPushButton(self.selectSizeGroup)
+        self.ten.setGeometry(QtCore.QRect(20, 110, 251, 71))
+        self.ten.setStyleSheet("background-color: rgb(131, 226, 255);\n"
+"border:2px solid #000;\n"
+"border-radius: 30px;")
+        self.ten.setObjectName("ten")
+        self.sixteen = QtWidgets.QPushButton(self.selectSizeGroup)
+        self.sixteen.setGeometry(QtCore.QRect(20, 190, 251, 71))
+        self.sixteen.setStyleSheet("background-color: rgb(255, 149, 149);\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;")
+        self.sixteen.setObjectName("sixteen")
+        self.stackedWidget.addWidget(self.selectBoardSizeMenuPage)
+        self.selectGameModeMenuPage = QtWidgets.QWidget()
+        self.selectGameModeMenuPage.setStyleSheet("background-image: url(\"image:White-Background.jpg\") 0 0 0 0 stretch stretch;")
+        self.selectGameModeMenuPage.setObjectName("selectGameModeMenuPage")
+        self.selectModeGroup = QtWidgets.QGroupBox(self.selectGameModeMenuPage)
+        self.selectModeGroup.setGeometry(QtCore.QRect(338, 260, 441, 521))
+        self.selectModeGroup.setStyleSheet("background: none;\n"
+"border: none;")
+        self.selectModeGroup.setTitle("")
+        self.selectModeGroup.setObjectName("selectModeGroup")
+        self.humanVsMinimax = QtWidgets.QPushButton(self.selectModeGroup)
+        self.humanVsMinimax.setGeometry(QtCore.QRect(20, 20, 401, 81))
+        self.humanVsMinimax.setStyleSheet("background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 rgb(170, 255, 127), stop:1 rgb(255, 170, 255));\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"font: 10pt \"Courier New\";")
+        self.humanVsMinimax.setObjectName("humanVsMinimax")
+        self.humanVsLocalSearch = QtWidgets.QPushButton(self.selectModeGroup)
+        self.humanVsLocalSearch.setGeometry(QtCore.QRect(20, 120, 401, 81))
+        self.humanVsLocalSearch.setStyleSheet("background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 rgb(170, 255, 127), stop:1 rgb(170, 255, 255));\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"font: 10pt \"Courier New\";")
+        self.humanVsLocalSearch.setObjectName("humanVsLocalSearch")
+        self.minimaxVsLocalSearch = QtWidgets.QPushButton(self.selectModeGroup)
+        self.minimaxVsLocalSearch.setGeometry(QtCore.QRect(20, 220, 401, 81))
+        self.minimaxVsLocalSearch.setStyleSheet("background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 rgb(255, 170, 255), stop:1 rgb(170, 255, 255));\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"font: 10pt \"Courier New\";")
+        self.minimaxVsLocalSearch.setObjectName("minimaxVsLocalSearch")
+        self.humanVsMCTS = QtWidgets.QPushButton(self.selectModeGroup)
+        self.humanVsMCTS.setGeometry(QtCore.QRect(20, 320, 401, 81))
+        self.humanVsMCTS.setStyleSheet("background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 rgb(170, 255, 127), stop:1 rgb(255, 255, 127));\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"font: 10pt \"Courier New\";")
+        self.humanVsMCTS.setObjectName("humanVsMCTS")
+        self.minimaxVsMCTS = QtWidgets.QPushButton(self.selectModeGroup)
+        self.minimaxVsMCTS.setGeometry(QtCore.QRect(20, 420, 401, 81))
+        self.minimaxVsMCTS.setStyleSheet("background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 rgb(255, 170, 255), stop:1 rgb(255, 255, 127));\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"font: 10pt \"Courier New\";")
+        self.minimaxVsMCTS.setObjectName("minimaxVsMCTS")
+        self.selectGameModeTitle = QtWidgets.QLabel(self.selectGameModeMenuPage)
+        self.selectGameModeTitle.setGeometry(QtCore.QRect(310, 180, 501, 71))
+        font = QtGui.QFont()
+        font.setFamily("Candara")
+        font.setPointSize(30)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.selectGameModeTitle.setFont(font)
+        self.selectGameModeTitle.setStyleSheet("background: none;\n"
+"border-image: none;\n"
+"font: 30pt \"Candara\";")
+        self.selectGameModeTitle.setTextFormat(QtCore.Qt.AutoText)
+        self.selectGameModeTitle.setAlignment(QtCore.Qt.AlignCenter)
+        self.selectGameModeTitle.setObjectName("selectGameModeTitle")
+        self.stackedWidget.addWidget(self.selectGameModeMenuPage)
+        self.selectSideMenuPage = QtWidgets.QWidget()
+        self.selectSideMenuPage.setStyleSheet("background-image: url(\"image:White-Background.jpg\") 0 0 0 0 stretch stretch;")
+        self.selectSideMenuPage.setObjectName("selectSideMenuPage")
+        self.selectSideTitle = QtWidgets.QLabel(self.selectSideMenuPage)
+        self.selectSideTitle.setGeometry(QtCore.QRect(310, 190, 501, 71))
+        font = QtGui.QFont()
+        font.setFamily("Candara")
+        font.setPointSize(30)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.selectSideTitle.setFont(font)
+        self.selectSideTitle.setStyleSheet("background: none;\n"
+"border-image: none;\n"
+"font: 30pt \"Candara\";")
+        self.selectSideTitle.setTextFormat(QtCore.Qt.AutoText)
+        self.selectSideTitle.setAlignment(QtCore.Qt.AlignCenter)
+        self.selectSideTitle.setObjectName("selectSideTitle")
+        self.selectSideGroup = QtWidgets.QGroupBox(self.selectSideMenuPage)
+        self.selectSideGroup.setGeometry(QtCore.QRect(420, 260, 291, 321))
+        self.selectSideGroup.setStyleSheet("font: 12pt \"Courier New\";\n"
+"background: none;\n"
+"border: none;")
+        self.selectSideGroup.setTitle("")
+        self.selectSideGroup.setObjectName("selectSideGroup")
+        self.pGreenBtn = QtWidgets.QPushButton(self.selectSideGroup)
+        self.pGreenBtn.setGeometry(QtCore.QRect(20, 110, 251, 71))
+        self.pGreenBtn.setStyleSheet("background-color: rgb(171, 255, 206);\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"")
+        self.pGreenBtn.setObjectName("pGreenBtn")
+        self.pRedBtn = QtWidgets.QPushButton(self.selectSideGroup)
+        self.pRedBtn.setGeometry(QtCore.QRect(20, 30, 251, 71))
+        self.pRedBtn.setStyleSheet("background-color: rgb(255, 155, 155);\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;\n"
+"")
+        self.pRedBtn.setObjectName("pRedBtn")
+        self.mainMenuNavBtn = QtWidgets.QPushButton(self.selectSideGroup)
+        self.mainMenuNavBtn.setGeometry(QtCore.QRect(20, 190, 251, 71))
+        self.mainMenuNavBtn.setStyleSheet("background-color: rgb(195, 196, 198);\n"
+"border: 2px solid #000;\n"
+"border-radius: 30px;")
+        self.mainMenuNavBtn.setObjectName("mainMenuNavBtn")
+        self.stackedWidget.addWidget(self.selectSideMenuPage)
+        self.maxTimePage = QtWidgets.QWidget()
+        self.maxTimePage.setStyleSheet("background-image: url(\"image:White-Background.jpg\") 0 0 0 0 stretch stretch;")
+        self.maxTimePage.setObjectName("maxTimePage")
+        self.maxTimeGroup = QtWidgets.QGroupBox(self.maxTimePage)
+        self.maxTimeGroup.setGeometry(QtCore.QRect(420, 260, 291, 321))
+        self.maxTimeGroup.setStyleSheet("font: 12pt \"Courier New\";\n"
+"background: none;\n"
+"border: none;")
+        self.maxTimeGroup.setTitle("")
+        self.maxTimeGroup.setObjectName("maxTimeGroup")
+        self.startGameButton = QtWidgets.QPushButton(self.maxTimeGroup)
+        self.startGameButton.setGeometry(QtCore.QRect(30, 110, 251, 61))
+        self.startGameButton.setAutoFillBackground(False)
+        self.startGameButton.setStyleSheet("background-color: rgb(75, 186, 255);\n"
+"border-radius: 30px;\n"
+"border: 2px solid #000;\n"
+"font: 30px \"Candara\"\n"
+"")
+        self.startGameButton.setObjectName("startGameButton")
+        self.gameTimeLabel = QtWidgets.QLabel(self.maxTimeGroup)
+        self.gameTimeLabel.setGeometry(QtCore.QRect(30, 190, 251, 30))
+        self.gameTimeLabel.setAlignment(QtCore.Qt.AlignCenter)
+        self.gameTimeLabel.setObjectName("gameTimeLabel")
+        self.gameTime = QtWidgets.QDoubleSpinBox(self.maxTimeGroup)
+        self.gameTime.setGeometry(QtCore.QRect(110, 225, 91, 50))
+        self.gameTime.setDecimals(0)
+        self.gameTime.setMaximum(3600.0)
+        self.gameTime.setSingleStep(10.0)
+        self.gameTime.setProperty("value", 0.0)
+        self.gameTime.setObjectName("gameTime")
+        self.maxTime = QtWidgets.QDoubleSpinBox(self.maxTimeGroup)
+        self.maxTime.setGeometry(QtCore.QRect(120, 40, 71, 50))
+        self.maxTime.setDecimals(2)
+        self.maxTime.setMinimum(0.05)
+        self.maxTime.setSingleStep(0.01)
+        self.maxTime.setProperty("value", 0.05)
+        self.maxTime.setObjectName("maxTime")
+        self.maxTimeTitle = QtWidgets.QLabel(self.maxTimePage)
+        self.maxTimeTitle.setGeometry(QtCore.QRect(330, 210, 501, 71))
+        font = QtGui.QFont()
+        font.setFamily("Candara")
+        font.setPointSize(30)
+        font.setBold(False)
+        font.setItalic(False)
+        font.setWeight(50)
+        self.maxTimeTitle.setFont(font)
+        self.maxTimeTitle.setStyleSheet("background: none;\n"
+"border-image: none;\n"
+"font: 30pt \"Candara\";")
+        self.maxTimeTitle.setTextFormat(QtCore.Qt.AutoText)
+        self.maxTimeTitle.setAlignment(QtCore.Qt.AlignCenter)
+        self.maxTimeTitle.setObjectName("maxTimeTitle")
+        self.stackedWidget.addWidget(self.maxTimePage)
+        self.inGamePage = QtWidgets.QWidget()
+        self.inGamePage.setStyleSheet("background-color: rgb(50, 170, 250);")
+        self.inGamePage.setObjectName("inGamePage")
+        self.fieldsLabel = QtWidgets.QLabel(self.inGamePage)
+        self.fieldsLabel.setGeometry(QtCore.QRect(40, 70, 701, 701))
+        self.fieldsLabel.setFrameShape(QtWidgets.QFrame.Box)
+        self.fieldsLabel.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self.fieldsLabel.setText("")
+        self.fieldsLabel.setObjectName("fieldsLabel")
+        self.gridLayoutWidget = QtWidgets.QWidget(self.inGamePage)
+        self.gridLayoutWidget.setGeometry(QtCore.QRect(49, 79, 681, 681))
+        self.gridLayoutWidget.setObjectName("gridLayoutWidget")
+        self.fields = QtWidgets.QGridLayout(self.gridLayoutWidget)
+        self.fields.setContentsMargins(0, 0, 0, 0)
+        self.fields.setSpacing(0)
+        self.fields.setObjectName("fields")
+        self.curPlayer = QtWidgets.QLabel(self.inGamePage)
+        self.curPlayer.setGeometry(QtCore.QRect(800, 90, 231, 41))
+        font = QtGui.QFont()
+        font.setFamily("Segoe UI Semibold")
+        font.setPointSize(13)
+        self.curPlayer.setFont(font)
+        self.curPlayer.setText("")
+        self.curPlayer.setTextFormat(QtCore.Qt.AutoText)
+        self.curPlayer.setAlignment(QtCore.Qt.AlignCenter)
+        self.curPlayer.setObjectName("curPlayer")
+        self.quitGameBtn = QtWidgets.QPushButton(self.inGamePage)
+        self.quitGameBtn.setGeometry(QtCore.QRect(860, 150, 141, 51))
+        self.quitGameBtn.setObjectName("quitGameBtn")
+        self.stackedWidget.addWidget(self.inGamePage)
+        MainWindow.setCentralWidget(self.centralwidget)
+
+        self.retranslateUi(MainWindow)
+        self.stackedWidget.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
+        self.mainTitle.setText(_translate("MainWindow", "HALMA GAME"))
+        self.exitBtn.setText(_translate("MainWindow", "Exit"))
+        self.playGameBtn.setText(_translate("MainWindow", "Play Game"))
+        self.selectSizeTitle.setText(_translate("MainWindow", "Select Board Size"))
+        self.eight.setText(_translate("MainWindow", "8 x 8"))
+        self.ten.setText(_translate("MainWindow", "10 x 10"))
+        self.sixteen.setText(_translate("MainWindow", "16 x 16"))
+        self.humanVsMinimax.setText(_translate("MainWindow", "Human vs Bot Minimax"))
+        self.humanVsLocalSearch.setText(_translate("MainWindow", "Human vs Bot Minimax with Local Search"))
+        self.minimaxVsLocalSearch.setText(_translate("MainWindow", "Bot Minimax vs Bot Minimax Local Search"))
+        self.humanVsMCTS.setText(_translate("MainWindow", "Human vs Bot Monte Carlo Tree Search"))
+        self.minimaxVsMCTS.setText(_translate("MainWindow", "Bot Minimax vs Bot Monte Carlo Tree Search"))
+        self.selectGameModeTitle.setText(_translate("MainWindow", "Select Game Mode"))
+        self.selectSideTitle.setText(_translate("MainWindow", "Select Your Side"))
+        self.pGreenBtn.setText(_translate("MainWindow", "Player Green"))
+        self.pRedBtn.setText(_translate("MainWindow", "Player Red"))
+        self.mainMenuNavBtn.setText(_translate("MainWindow", "Back to Main Menu"))
+        self.startGameButton.setText(_translate("MainWindow", "Start Game"))
+        self.gameTimeLabel.setText(_translate("MainWindow", "Game clock (s, 0 = off)"))
+        self.maxTimeTitle.setText(_translate("MainWindow", "Input Max Time"))
+        self.quitGameBtn.setText(_translate("MainWindow", "Quit Game"))
@@ -1,6 +1,7 @@
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
+from controller.time_manager import StopToken
 
 
 class WorkerSignals(QObject):
@@ -12,12 +13,20 @@ class WorkerSignals(QObject):
     done = pyqtSignal()
 
 class Worker(QRunnable):
-    def __init__(self, function, *args, **kwargs):
+    # cancellable: function takes a stop keyword, cancel() makes it return early
+    def __init__(self, function, *args, cancellable=False, **kwargs):
         super(Worker, self).__init__()
         self.function = function
         self.args = args
         self.kwargs = kwargs
         self.signals = WorkerSignals()
+        self.stop = StopToken()
+        if cancellable:
+            self.kwargs["stop"] = self.stop
+
+    def cancel(self):
+        # The search stops within a few milliseconds and still emits its best move so far
+        self.stop.cancel()
 
     @pyqtSlot()
     def run(self):